@@ -0,0 +1,51 @@
+#!/usr/bin/env python-sirius
+"""Benchmark of the structure memoization of get_family_data.
+
+For each lattice version the mean wall time of a call of get_family_data
+computing the family data (miss) is compared with the one of a memoized
+call (hit), split in the structure key and the copy of the result.
+
+Usage: python-sirius family_data_cache.py [nr_runs]
+"""
+
+import sys
+import time
+
+import pymodels
+from pymodels import cache
+
+
+VERSIONS = ('si', 'bo', 'tb', 'ts', 'li')
+
+
+def mean_time(func, nr_runs):
+    """Return mean wall time [s] of calling func."""
+    t0 = time.perf_counter()
+    for _ in range(nr_runs):
+        func()
+    return (time.perf_counter() - t0) / nr_runs
+
+
+def main():
+    nr_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print('{:8s} {:>10s} {:>10s} {:>10s} {:>10s} {:>8s}'.format(
+        'version', 'miss [ms]', 'hit [ms]', 'key [ms]', 'copy [ms]',
+        'speedup'))
+    for name in VERSIONS:
+        pkg = getattr(pymodels, name)
+        acc = pkg.create_accelerator()
+        if isinstance(acc, tuple):
+            # transport lines also return twiss at start
+            acc = acc[0]
+        get_data = pkg.get_family_data
+        data = get_data(acc)
+        miss = mean_time(lambda: get_data.__wrapped__(acc), nr_runs)
+        hit = mean_time(lambda: get_data(acc), nr_runs)
+        key = mean_time(lambda: cache.get_structure_key(acc), nr_runs)
+        copy = mean_time(lambda: cache._copy_containers(data), nr_runs)
+        print('{:8s} {:10.3f} {:10.3f} {:10.3f} {:10.3f} {:8.1f}'.format(
+            name, miss*1e3, hit*1e3, key*1e3, copy*1e3, miss/hit))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python-sirius
+"""Benchmark of the startup time of worker processes importing pymodels.
+
+Each case runs in a fresh interpreter, as a worker process would, and the
+median wall time of several runs is reported. The 'eager' case imports all
+lattice versions and the middlelayer, as 'import pymodels' used to do.
+
+Usage: python-sirius import_time.py [nr_runs]
+"""
+
+import sys
+import time
+import subprocess
+
+
+CASES = (
+    ('python only', 'pass'),
+    ('import pymodels', 'import pymodels'),
+    ('pymodels.si', 'import pymodels; pymodels.si'),
+    ('pymodels.bo', 'import pymodels; pymodels.bo'),
+    ('eager', 'import pymodels; [getattr(pymodels, v) for v in '
+              'pymodels.__all__]; pymodels.middlelayer'),
+)
+
+
+def run_case(code, nr_runs):
+    """Return median wall time [s] of running code in a new interpreter."""
+    times = []
+    for _ in range(nr_runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        times.append(time.perf_counter() - t0)
+    return sorted(times)[len(times)//2]
+
+
+def main():
+    nr_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for label, code in CASES:
+        print('{:20s} {:8.3f} s'.format(label, run_case(code, nr_runs)))
+
+
+if __name__ == '__main__':
+    main()
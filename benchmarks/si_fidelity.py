@@ -0,0 +1,101 @@
+#!/usr/bin/env python-sirius
+"""Benchmark of tracking time against accuracy of the SI fidelity levels.
+
+For each fidelity level of the SI_V25_01 segmented models the wall time of
+tracking a grid of particles through the ring is reported together with the
+deviations of tunes, chromaticities and on-axis dynamic aperture from the
+'full' level. The dynamic aperture is the largest amplitude of the grid up
+to which all particles survive nr_turns.
+
+Usage: python-sirius si_fidelity.py [nr_turns]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pyaccel
+
+import pymodels
+
+
+DELTA = 1e-4  # energy offset of the chromaticity calculation
+AMPLITUDES_X = np.linspace(0.2e-3, 14e-3, 70)  # [m]
+AMPLITUDES_Y = np.linspace(0.1e-3, 5e-3, 50)  # [m]
+OFFSET = 1e-5  # [m] amplitude in the other plane
+
+
+def get_tunes(acc, energy_offset=0.0):
+    """Return horizontal and vertical tunes of acc."""
+    twiss = pyaccel.optics.calc_twiss(acc, energy_offset=energy_offset)[0]
+    return np.array([twiss.mux[-1], twiss.muy[-1]]) / (2*np.pi)
+
+
+def get_chromaticities(acc):
+    """Return horizontal and vertical chromaticities of acc."""
+    tunes_p = get_tunes(acc, +DELTA/2)
+    tunes_n = get_tunes(acc, -DELTA/2)
+    return (tunes_p - tunes_n) / DELTA
+
+
+def track_aperture(acc, nr_turns):
+    """Return dynamic aperture [m] along x and y and tracking time [s]."""
+    nr_x, nr_y = len(AMPLITUDES_X), len(AMPLITUDES_Y)
+    particles = np.zeros((6, nr_x + nr_y))
+    particles[0, :nr_x] = AMPLITUDES_X
+    particles[2, :nr_x] = OFFSET
+    particles[0, nr_x:] = OFFSET
+    particles[2, nr_x:] = AMPLITUDES_Y
+    t0 = time.perf_counter()
+    part_out = pyaccel.tracking.ring_pass(acc, particles, nr_turns)[0]
+    dtime = time.perf_counter() - t0
+    lost = np.isnan(np.asarray(part_out)[0])
+    return (
+        _get_aperture(AMPLITUDES_X, lost[:nr_x]),
+        _get_aperture(AMPLITUDES_Y, lost[nr_x:]),
+        dtime)
+
+
+def _get_aperture(amplitudes, lost):
+    if not np.any(lost):
+        return amplitudes[-1]
+    first = np.argmax(lost)
+    return amplitudes[first-1] if first else 0.0
+
+
+def run_level(fidelity, nr_turns):
+    """Return results of a fidelity level as a dict."""
+    acc = pymodels.si.create_accelerator(fidelity=fidelity)
+    dax, day, dtime = track_aperture(acc, nr_turns)
+    return {
+        'nr_elements': len(acc),
+        'time': dtime,
+        'tunes': get_tunes(acc),
+        'chroms': get_chromaticities(acc),
+        'da': np.array([dax, day]),
+        }
+
+
+def main():
+    nr_turns = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    levels = pymodels.si.segmented_models.fidelity_levels
+    results = {level: run_level(level, nr_turns) for level in levels}
+    ref = results['full']
+    print('{:8s} {:>8s} {:>9s} {:>8s} {:>9s} {:>9s} {:>9s} {:>9s} {:>8s} '
+          '{:>8s}'.format(
+              'fidelity', 'elements', 'time [s]', 'speedup', 'dtunex',
+              'dtuney', 'dchromx', 'dchromy', 'dDAx[mm]', 'dDAy[mm]'))
+    for level in levels:
+        res = results[level]
+        dtunes = res['tunes'] - ref['tunes']
+        dchroms = res['chroms'] - ref['chroms']
+        dda = (res['da'] - ref['da']) * 1e3
+        print('{:8s} {:8d} {:9.3f} {:8.2f} {:9.2e} {:9.2e} {:9.2e} {:9.2e} '
+              '{:8.2f} {:8.2f}'.format(
+                  level, res['nr_elements'], res['time'],
+                  ref['time']/res['time'], dtunes[0], dtunes[1], dchroms[0],
+                  dchroms[1], dda[0], dda[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python-sirius
+"""Benchmark of SI lattice variants stored as settings deltas.
+
+Lattices with random systematic quadrupole errors are built as settings
+deltas of one nominal reference lattice (create_lattice with reference) and
+the memory of their deltas is compared with the one of full lattices. The
+wall time of switching the reference to a variant in place (applying its
+delta and then the returned restore delta) is compared with the one of
+building the variant.
+
+Usage: python-sirius si_settings_delta.py [nr_variants]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import pymodels
+from pymodels import utils
+
+
+QUADRUPOLES = (
+    'QFA', 'QDA', 'Q1', 'Q2', 'Q3', 'Q4', 'QDB1', 'QFB', 'QDB2', 'QDP1',
+    'QFP', 'QDP2')
+ERROR = 1e-3  # rms relative strength error
+
+
+def get_nbytes(values):
+    """Return number of bytes of the attribute values of a dict."""
+    return sum(np.asarray(value).nbytes for value in values.values())
+
+
+def get_lattice_nbytes(lattice):
+    """Return number of bytes of the tracking attributes of a lattice."""
+    return sum(
+        get_nbytes({attr: getattr(lattice[i], attr)
+                    for attr in utils.tracking_attributes})
+        for i in range(len(lattice)))
+
+
+def main():
+    nr_variants = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    lattice = pymodels.si.lattice
+    rng = np.random.RandomState(0)
+    reference = lattice.create_lattice()
+    deltas, build_time = [], 0.0
+    for _ in range(nr_variants):
+        errors = dict(zip(QUADRUPOLES, ERROR*rng.randn(len(QUADRUPOLES))))
+        t0 = time.perf_counter()
+        deltas.append(lattice.create_lattice(
+            quadrupole_errors=errors, reference=reference))
+        build_time += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for delta in deltas:
+        restore = utils.apply_settings_delta(reference, delta)
+        utils.apply_settings_delta(reference, restore)
+    switch_time = time.perf_counter() - t0
+
+    full = get_lattice_nbytes(reference)
+    delta = np.mean([
+        sum(get_nbytes(values) for values in delta.values())
+        for delta in deltas])
+    print('elements per lattice       {:10d}'.format(len(reference)))
+    print('elements per delta         {:10.0f}'.format(
+        np.mean([len(delta) for delta in deltas])))
+    print('full lattice [kB]          {:10.1f}'.format(full/1e3))
+    print('delta [kB]                 {:10.1f}'.format(delta/1e3))
+    print('memory ratio               {:10.1f}'.format(full/delta))
+    print('build variant [ms]         {:10.2f}'.format(
+        build_time/nr_variants*1e3))
+    print('apply and restore [ms]     {:10.2f}'.format(
+        switch_time/nr_variants*1e3))
+
+
+if __name__ == '__main__':
+    main()
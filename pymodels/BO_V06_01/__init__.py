@@ -10,8 +10,10 @@ from .accelerator import create_accelerator
 from .families import family_mapping
 from .families import get_family_data
 from .families import get_section_name_mapping
+from .families import get_section_name_codes
 
 from .lattice import set_rf_voltage
+from .lattice import get_rf_voltage
 from .lattice import set_rf_frequency
 from .lattice import energy
 from .lattice import harmonic_number
@@ -19,4 +21,7 @@ from .lattice import default_optics_mode, lattice_symmetry
 
 from .control_system import get_control_system_data
 
+from .ramp import create_ramp_table
+from .ramp import apply_ramp_row
+
 lattice_version   = accelerator_data['lattice_version']
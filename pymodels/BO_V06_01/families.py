@@ -1,6 +1,10 @@
 
+import numpy as _np
 import pyaccel as _pyaccel
 
+from .. import utils as _utils
+from .. import cache as _cache
+
 
 _family_segmentation = {
     'B-1': 20, 'B-2': 20, 'B': 20, 'QF': 2, 'QD': 1, 'SD': 1, 'QS': 1,
@@ -74,70 +78,85 @@ def families_di():
     return ['DCCT', 'BPM', 'Scrn', 'TunePkup', 'TuneShkr', 'GSL']
 
 
-def get_section_name_mapping(lattice):
-        lat = lattice[:]
-        section_map = ['' for i in range(len(lat))]
-
-        # find where the nomenclature starts counting and shift the lattice:
-        start = _pyaccel.lattice.find_indices(lat, 'fam_name', 'start')[0]
-        b1 = _pyaccel.lattice.find_indices(lat, 'fam_name', 'B')
-        if b1[0] > start:
-            ind_shift = (b1[-1] + 1)  # Next element of last b1
-        else:
-            for i in b1[::-1]:  # except there is a b1 before start
-                if i < start:
-                    ind_shift = i + 1
-                    break
-        lat = _pyaccel.lattice.shift(lat, ind_shift)
-
-        # Find indices important to define the change of the names of
-        # the subsections
-        b = _pyaccel.lattice.find_indices(lat, 'fam_name', 'B')
-        qf = _pyaccel.lattice.find_indices(lat, 'fam_name', 'QF')
-        b_nrsegs = len(b)//50
-        qf_nrsegs = len(qf)//50
-
-        # divide the ring in 50 sectors defined by the b1 dipoles:
-        Sects = []
-        ini = 0
-        for i in range(len(b)//b_nrsegs):
-            fim = b[(i+1)*b_nrsegs-1] + 1
-            Sects.append(list(range(ini, fim)))
-            ini = fim
-
-        # Names of the subsections:
-        sub_secs = ['U', 'D']
-
-        for i, sec in enumerate(Sects, 1):
-            # conditions that define change in subsection name:
-            # define changes to ''
-            sec_b = [x for x in b if sec[0] <= x <= sec[-1]]
-            relev_inds = [sec_b[-1]]
-            # define changes to '' and D
-            sec_qf = [x for x in qf if sec[0] <= x <= sec[-1]]
-            relev_inds += [sec_qf[-1]]
-            relev_inds.sort()
-            # fill the section_map variable
-            ref = 0
-            for j in sec:
-                section_map[(ind_shift+j) % len(lat)] = "{0:02d}".format(i)
-                section_map[(ind_shift+j) % len(lat)] += sub_secs[ref]
-                if j >= relev_inds[ref]:
-                    ref += 1
-
-        return section_map
+def get_section_name_codes(lattice, fam_index=None):
+    """Return section name codes of the lattice elements.
+
+    Keyword argument:
+    lattice -- lattice model
+    fam_index -- optional pymodels.utils.LatticeIndex of the lattice
+
+    Returns int array with the code of each element and list of section
+    names, such that names[codes[i]] is the section name of element i.
+    """
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(lattice)
+    fam_index.check(lattice)
+    nr_eles = len(lattice)
+
+    # find where the nomenclature starts counting and shift the lattice:
+    start = fam_index['start'][0]
+    b1 = fam_index['B']
+    if b1[0] > start:
+        ind_shift = b1[-1] + 1  # Next element of last b1
+    else:
+        ind_shift = b1[b1 < start][-1] + 1  # except there is a b1 before start
+    lat = fam_index.shifted(ind_shift)
+
+    # Find indices important to define the change of the names of
+    # the subsections
+    b, qf = lat['B'], lat['QF']
+    b_nrsegs = len(b)//50
+
+    # divide the ring in 50 sectors defined by the b1 dipoles:
+    nr_sects = len(b)//b_nrsegs
+    sect_ends = b[b_nrsegs*_np.arange(1, nr_sects+1) - 1]
+
+    # conditions that define change in subsection name:
+    def last(idx):
+        return idx[_np.searchsorted(idx, sect_ends, side='right') - 1]
+
+    # define changes to '' and D
+    relev_inds = _np.column_stack([last(b), last(qf)])
+    sector, subsec = _utils.get_subsection_codes(
+        nr_eles, sect_ends, relev_inds)
+
+    # Names of the subsections:
+    sub_secs = ['U', 'D']
+    names = ['']
+    for i in range(1, nr_sects+1):
+        for sub in sub_secs:
+            names.append('{0:02d}'.format(i) + sub)
+
+    codes = _np.zeros(nr_eles, dtype=int)
+    sel = sector >= 0
+    codes[sel] = 1 + _np.ravel_multi_index(
+        (sector[sel], subsec[sel]), (nr_sects, len(sub_secs)))
+    codes = _np.roll(codes, ind_shift)
+    return codes, names
+
+
+def get_section_name_mapping(lattice, fam_index=None):
+    """Return list with section name of each lattice element.
+
+    fam_index is an optional pymodels.utils.LatticeIndex of the lattice.
+    """
+    codes, names = get_section_name_codes(lattice, fam_index)
+    return _np.array(names, dtype=object)[codes].tolist()
 
 
+@_cache.memoize_by_structure('BO_V06_01')
 def get_family_data(lattice):
     """Get pyaccel lattice model index and segmentation for each family name
 
     Keyword argument:
     lattice -- lattice model
 
-    Returns dict.
+    Returns dict. The result is memoized by the structure of the lattice;
+    each call returns a copy of it, which may be modified.
     """
-    latt_dict = _pyaccel.lattice.find_dict(lattice, 'fam_name')
-    section_map = get_section_name_mapping(lattice)
+    fam_index = _utils.LatticeIndex(lattice)
+    latt_dict = fam_index.find_dict()
+    section_map = get_section_name_mapping(lattice, fam_index)
 
     # Fill the data dictionary with index info ######
     data = {}
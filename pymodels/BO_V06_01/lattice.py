@@ -11,6 +11,7 @@ from pyaccel import lattice as _pyacc_lat, elements as _pyacc_ele, \
 import mathphys as _mp
 
 from . import segmented_models as _seg_models
+from .. import utils as _utils
 
 
 default_optics_mode = 'M0'
@@ -19,9 +20,31 @@ harmonic_number = 828
 energy = 0.15e9  # [eV]
 _d2r = _math.pi/180.0
 
+# hard-edge lengths [m] of the magnets with energy dependent models
+hardedge_lengths = {'sf': 0.105, 'sd': 0.105, 'qd': 0.100, 'qf': 0.228}
 
-def create_lattice(energy=energy, optics_mode=None):
-    """Create lattice function."""
+# integration steps: (selection, step length [m], minimum number of steps)
+integ_steps_rules = (
+    ('bend', 3e-2, 0),
+    ('multipole', 1.5e-2, 0),
+    (('InjSept', 'InjKckr', 'EjeSeptF', 'EjeKckr', 'QS'), 1.5e-2, 0),
+)
+
+# circumference change [m] with respect to the nominal lattice, distributed
+# in drifts of the 50 straight sections
+dcircum = 496.78745 - 496.80000
+
+
+def create_lattice(energy=energy, optics_mode=None, dcircum=dcircum,
+                   strengths=None, reference=None):
+    """Create lattice function.
+
+    dcircum and strengths (dict of magnet strengths, by default those of the
+    optics mode at the given energy) allow lattice versions to be declared as
+    deltas of this one. If reference, a lattice with the same structure, is
+    given, the settings delta of the lattice to it is returned instead of the
+    lattice (see utils.get_settings_delta).
+    """
     # -- shortcut symbols --
     marker = _pyacc_ele.marker
     drift = _pyacc_ele.drift
@@ -31,18 +54,23 @@ def create_lattice(energy=energy, optics_mode=None):
 
     optics_mode = optics_mode or default_optics_mode
 
-    strengths = get_optics_mode(optics_mode, energy)
+    if strengths is None:
+        strengths = get_optics_mode(optics_mode, energy)
 
     B, _ = _seg_models.dipole(energy)
 
-    dcircum = 496.78745 - 496.80000
+    def drift_dcircum(fam_name, length):
+        # drifts absorbing the circumference change
+        if dcircum:
+            return drift(fam_name + 'p', length + dcircum/50/2)
+        return drift(fam_name, length)
 
     # ----- DRIFTS ----
-    L008100p = drift('l008100p', 0.08100 + dcircum/50/2)
+    L008100p = drift_dcircum('l008100', 0.08100)
     L008800 = drift('l008800', 0.08800)
-    L010350p = drift('l010350p', 0.10350 + dcircum/50/2)
+    L010350p = drift_dcircum('l010350', 0.10350)
     L013350 = drift('l013350', 0.13350)
-    L010600p = drift('l010600p', 0.10600 + dcircum/50/2)
+    L010600p = drift_dcircum('l010600', 0.10600)
     L013600 = drift('l013600', 0.13600)
     L016100 = drift('l016100', 0.16100)
     L016750 = drift('l016750', 0.16750)
@@ -53,7 +81,7 @@ def create_lattice(energy=energy, optics_mode=None):
     L045000 = drift('l045000', 0.45000)
     L053572 = drift('l053572', 0.53572)
     L062000 = drift('l062000', 0.62000)
-    L069811p = drift('l069811p', 0.69811 + dcircum/50/2)
+    L069811p = drift_dcircum('l069811', 0.69811)
     L072500 = drift('l072500', 0.72500)
     L109600 = drift('l109600', 1.09600)
     L115740 = drift('l115740', 1.15740)
@@ -63,7 +91,7 @@ def create_lattice(energy=energy, optics_mode=None):
     L144600 = drift('l144600', 1.44600)
     L151200 = drift('l151200', 1.51200)
     L159628 = drift('l159628', 1.59628)
-    L165200p = drift('l165200p', 1.65200 + dcircum/50/2)
+    L165200p = drift_dcircum('l165200', 1.65200)
     L168300 = drift('l168300', 1.68300)
     L172600 = drift('l172600', 1.72600)
     L177100 = drift('l177100', 1.77100)
@@ -71,7 +99,7 @@ def create_lattice(energy=energy, optics_mode=None):
     L179600 = drift('l179600', 1.79600)
     L182100 = drift('l182100', 1.82100)
     L189350 = drift('l189350', 1.89350)
-    L200200p = drift('l200200p', 2.00200 + dcircum/50/2)
+    L200200p = drift_dcircum('l200200', 2.00200)
     L213200 = drift('l213200', 2.13200)
 
     STR  = marker('start')     # start of the model
@@ -93,11 +121,12 @@ def create_lattice(energy=energy, optics_mode=None):
     CH   = sextupole('CH',   0.150, 0.0)
     CV   = sextupole('CV',   0.150, 0.0)
 
-    SF,_  = _seg_models.sx_sextupole(energy, 'SF', strengths['sf'] * 0.105)
-    SD,_  = _seg_models.sx_sextupole(energy, 'SD', strengths['sd'] * 0.105)
+    hle = hardedge_lengths
+    SF,_  = _seg_models.sx_sextupole(energy, 'SF', strengths['sf'] * hle['sf'])
+    SD,_  = _seg_models.sx_sextupole(energy, 'SD', strengths['sd'] * hle['sd'])
 
-    QD,_  = _seg_models.qd_quadrupole(energy, 'QD', strengths['qd'] * 0.100)
-    QF,_  = _seg_models.qf_quadrupole(energy, 'QF', strengths['qf'] * 0.228)
+    QD,_  = _seg_models.qd_quadrupole(energy, 'QD', strengths['qd'] * hle['qd'])
+    QF,_  = _seg_models.qf_quadrupole(energy, 'QF', strengths['qf'] * hle['qf'])
     QS    = quadrupole('QS', 0.100, strengths['qs'])
     QF0   = [QF[0], FIM, STR, QF[1:]]
 
@@ -304,6 +333,8 @@ def create_lattice(energy=energy, optics_mode=None):
     # -- define vacuum chamber for all elements
     the_ring = set_vacuum_chamber(the_ring)
 
+    if reference is not None:
+        return _utils.get_settings_delta(the_ring, reference)
     return the_ring
 
 
@@ -355,8 +386,9 @@ def set_rf_frequency(the_ring):
         the_ring[i].frequency = rf_frequency
 
 
-def set_rf_voltage(the_ring, energy):
-    """Set RF voltage of the lattice."""
+def get_rf_voltage(energy):
+    """Return RF voltage [V] for beam energy [eV], float or array."""
+    energy = _np.asarray(energy, dtype=float)
     overvoltage = 1.525
     energy0 = 0.15e9
     rho0 = 1.152*50/(2*_math.pi)
@@ -364,7 +396,12 @@ def set_rf_voltage(the_ring, energy):
 
     voltage_inj = 150e3 - overvoltage*((_mp.constants.rad_cgamma*((energy0*1e-9)**4)/rho0)*1e9)
     voltage_eje = 950e3
-    voltage = min([(overvoltage*U0 + voltage_inj), voltage_eje])
+    return _np.minimum(overvoltage*U0 + voltage_inj, voltage_eje)
+
+
+def set_rf_voltage(the_ring, energy):
+    """Set RF voltage of the lattice."""
+    voltage = float(get_rf_voltage(energy))
 
     idx = _pyacc_lat.find_indices(the_ring, 'fam_name', 'P5Cav')
     for i in idx:
@@ -373,23 +410,7 @@ def set_rf_voltage(the_ring, energy):
 
 def set_num_integ_steps(the_ring):
     """Set number of integration steps in each lattice element."""
-    bends = []
-    for i, _ in enumerate(the_ring):
-        if the_ring[i].angle:
-            bends.append(i)
-
-    len_b = 3e-2
-    len_qs = 1.5e-2
-
-    zero_polyB = ('InjSept', 'InjKckr', 'EjeSeptF', 'EjeKckr', 'QS')
-
-    for i, _ in enumerate(the_ring):
-        if i in bends:
-            nr_steps = int(_math.ceil(the_ring[i].length/len_b))
-            the_ring[i].nr_steps = nr_steps
-        elif any(the_ring[i].polynom_b) or the_ring[i].fam_name in zero_polyB:
-            nr_steps = int(_math.ceil(the_ring[i].length/len_qs))
-            the_ring[i].nr_steps = nr_steps
+    _utils.set_num_integ_steps(the_ring, integ_steps_rules)
 
 
 def set_vacuum_chamber(the_ring):
@@ -398,6 +419,7 @@ def set_vacuum_chamber(the_ring):
     bends_vchamber = [-0.0117, 0.0117, -0.0117, 0.0117]
     other_vchamber = [-0.018, 0.018, -0.018, 0.018]
     extraction_vchamber = [-0.018, 0.026, -0.018, 0.018]
+    injection_vchamber = [-0.05, None, None, None]  # Verificar valor real
 
     sept_in = _pyacc_lat.find_indices(the_ring, 'fam_name', 'InjSept')[0]
     kick_in = _pyacc_lat.find_indices(the_ring, 'fam_name', 'InjKckr')[0]
@@ -407,39 +429,18 @@ def set_vacuum_chamber(the_ring):
     kick_ex = _pyacc_lat.find_indices(the_ring, 'fam_name', 'EjeKckr')[0]
     b_ex = b[b > kick_ex]; b_ex = b_ex[b_ex < sept_ex]
 
-    for i, _ in enumerate(the_ring):
-        if the_ring[i].angle:
-            the_ring[i].hmin = bends_vchamber[0]
-            the_ring[i].hmax = bends_vchamber[1]
-            the_ring[i].vmin = bends_vchamber[2]
-            the_ring[i].vmax = bends_vchamber[3]
-        elif the_ring[i].fam_name in ['mB']:
-            the_ring[i].hmin = bends_vchamber[0]
-            the_ring[i].hmax = bends_vchamber[1]
-            the_ring[i].vmin = bends_vchamber[2]
-            the_ring[i].vmax = bends_vchamber[3]
-        else:
-            the_ring[i].hmin = other_vchamber[0]
-            the_ring[i].hmax = other_vchamber[1]
-            the_ring[i].vmin = other_vchamber[2]
-            the_ring[i].vmax = other_vchamber[3]
-
-    # vaccum chamber on the injection section
-    for i in range(sept_in, len(the_ring)):
-        the_ring[i].hmin = -0.05 # Verificar valor real
-    for i in range(kick_in):
-        the_ring[i].hmin = -0.05 # Verificar valor real
-
-    # vaccum chamber on the extraction section
-    for i in range(b_ex[0], b_ex[-1]+1): # Verificar
-        the_ring[i].hmin = other_vchamber[0]
-        the_ring[i].hmax = other_vchamber[1]
-        the_ring[i].vmin = other_vchamber[2]
-        the_ring[i].vmax = other_vchamber[3]
-    for i in range(b_ex[-1], sept_ex +1):
-        the_ring[i].hmin = extraction_vchamber[0]
-        the_ring[i].hmax = extraction_vchamber[1]
-        the_ring[i].vmin = extraction_vchamber[2]
-        the_ring[i].vmax = extraction_vchamber[3]
+    angle = _np.asarray(_pyacc_lat.get_attribute(the_ring, 'angle'))
+    mb = _pyacc_lat.find_indices(the_ring, 'fam_name', 'mB')
+    bends = _np.union1d(_np.nonzero(angle)[0], mb).astype(int)
+
+    regions = [
+        (bends, bends_vchamber),
+        # vaccum chamber on the injection section
+        (_np.r_[sept_in:len(the_ring), :kick_in], injection_vchamber),
+        # vaccum chamber on the extraction section
+        (_np.r_[b_ex[0]:b_ex[-1]+1], other_vchamber),  # Verificar
+        (_np.r_[b_ex[-1]:sept_ex+1], extraction_vchamber),
+    ]
+    _utils.set_vacuum_chamber(the_ring, other_vchamber, regions)
 
     return the_ring
@@ -0,0 +1,106 @@
+"""Booster ramp tables.
+
+A ramp table holds, for each energy of a ramp, the optics mode strengths,
+the RF voltage and the polynom_b of the segments of the energy dependent
+magnet models. All rows are computed at once with array operations and any
+row can be applied to an already built booster model.
+"""
+
+import numpy as _np
+
+from .. import utils as _utils
+from . import lattice as _lattice
+from . import segmented_models as _seg_models
+
+
+# families with energy dependent models: (family, model, strength)
+_model_families = (
+    ('B', 'B', None),
+    ('SF', 'SX', 'sf'),
+    ('SD', 'SX', 'sd'),
+    ('QD', 'QD', 'qd'),
+    ('QF', 'QF', 'qf'),
+    )
+
+
+def create_ramp_table(energies, optics_mode=None):
+    """Return ramp table for an array of energies.
+
+    Keyword arguments:
+    energies -- beam energies [eV]
+    optics_mode -- optics mode of the strengths (default optics mode if None)
+
+    Returns numpy structured array with one row per energy and fields
+        'energy' -- beam energy [eV]
+        'qf', 'qd', 'qs', 'sf', 'sd' -- strengths of get_optics_mode
+        'rf_voltage' -- RF voltage [V]
+        'B', 'SF', 'SD', 'QD', 'QF' -- (nr_segments, nr_monomials) arrays
+            with polynom_b of the segments of the magnet models.
+    """
+    energies = _np.atleast_1d(_np.asarray(energies, dtype=float))
+    optics_mode = optics_mode or _lattice.default_optics_mode
+    strengths = _lattice.get_optics_mode(optics_mode, energies)
+
+    polynoms = dict()
+    for fam, model, strength in _model_families:
+        polyb = _seg_models.get_polynom_b(model, energies)
+        polyb = polyb[:, _seg_models.get_segment_types(model) == 1]
+        if strength is not None:
+            hardedge = strengths[strength] * _lattice.hardedge_lengths[strength]
+            polyb *= hardedge[:, None, None]
+        polynoms[fam] = polyb
+
+    dtype = [('energy', float)]
+    dtype += [(key, float) for key in strengths]
+    dtype += [('rf_voltage', float)]
+    dtype += [(fam, float, pol.shape[1:]) for fam, pol in polynoms.items()]
+    table = _np.zeros(len(energies), dtype=dtype)
+    table['energy'] = energies
+    for key, value in strengths.items():
+        table[key] = value
+    table['rf_voltage'] = _lattice.get_rf_voltage(energies)
+    for fam, polyb in polynoms.items():
+        table[fam] = polyb
+    return table
+
+
+def apply_ramp_row(the_ring, row, fam_index=None):
+    """Set booster model to a row of a ramp table, in place.
+
+    Keyword arguments:
+    the_ring -- booster lattice or accelerator created at any energy with
+        the optics mode of the table. The energy of accelerators is set too.
+    row -- row of the table returned by create_ramp_table
+    fam_index -- optional pymodels.utils.LatticeIndex of the lattice
+    """
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(the_ring)
+    fam_index.check(the_ring)
+
+    for fam, *_ in _model_families:
+        polyb = _get_magnet_polynom_b(fam, row[fam])
+        nr_segs = len(polyb)
+        for j, idx in enumerate(fam_index[fam].tolist()):
+            the_ring[idx].polynom_b = polyb[j % nr_segs]
+
+    for idx in fam_index['QS'].tolist():
+        polyb = the_ring[idx].polynom_b
+        polyb[1] = row['qs']
+        the_ring[idx].polynom_b = polyb
+
+    for idx in fam_index['P5Cav'].tolist():
+        the_ring[idx].voltage = float(row['rf_voltage'])
+
+    if hasattr(the_ring, 'energy'):
+        the_ring.energy = float(row['energy'])
+
+
+def _get_magnet_polynom_b(fam, polyb):
+    """Return polynom_b of the lattice elements of one magnet."""
+    if fam == 'B':
+        # dipole model is built with mirrored halves
+        return _np.concatenate([polyb[::-1], polyb])
+    if fam == 'QF':
+        # QF model is built with two equal halves
+        return _np.concatenate([polyb, polyb])
+    return polyb
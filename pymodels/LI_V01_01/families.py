@@ -3,6 +3,9 @@
 import pyaccel as _pyaccel
 import numpy as _np
 
+from .. import utils as _utils
+from .. import cache as _cache
+
 _family_segmentation = {
     'Spect':2, 'Lens':1,
     'QF1':1, 'QF2':1, 'QF3':1,
@@ -100,12 +103,11 @@ def families_di():
     return ['Scrn','ICT','BPM']
 
 def get_section_name_mapping(lattice):
-    section_map = len(lattice)*['']
+    nr_eles = len(lattice)
 
     #Find indices important to define the change of the names of the subsections
     spect = _pyaccel.lattice.find_indices(lattice,'fam_name','Spect')
     spect_nrsegs = len(spect)
-    start = _pyaccel.lattice.find_indices(lattice,'fam_name','start')
 
     # Names of the sections:
     if abs(lattice[spect[0]].angle) >= 40*(_np.pi/360)/spect_nrsegs:
@@ -114,23 +116,20 @@ def get_section_name_mapping(lattice):
         secs = ['01','02']
 
     ## conditions that define change in subsection name:
-    relev_inds = [spect[-1], len(lattice)-1]
-    relev_inds.sort()
-    ## fill the section_map variable
-    ref = 0
-    for j in range(len(lattice)):
-        section_map[j] = secs[ref]
-        if j >= relev_inds[ref]: ref += 1
+    relev_inds = [spect[-1], nr_eles-1]
+    _, codes = _utils.get_subsection_codes(nr_eles, [nr_eles-1], [relev_inds])
 
-    return section_map
+    return _np.array(secs, dtype=object)[codes].tolist()
 
+@_cache.memoize_by_structure('LI_V01_01')
 def get_family_data(lattice):
     """Get pyaccel lattice model index and segmentation for each family name
 
     Keyword argument:
     lattice -- lattice model
 
-    Returns dict.
+    Returns dict. The result is memoized by the structure of the lattice;
+    each call returns a copy of it, which may be modified.
     """
     latt_dict = _pyaccel.lattice.find_dict(lattice,'fam_name')
     section_map = get_section_name_mapping(lattice)
@@ -4,6 +4,7 @@ import math as _math
 import numpy as _np
 import pyaccel as _pyaccel
 import mathphys as _mp
+from .. import utils as _utils
 
 default_optics_mode = 'M1'
 default_operation_mode = 'injection'
@@ -16,6 +17,14 @@ single_bunch_pulse_duration = 1e-9 #[seconds]
 multi_bunch_pulse_duration = 150e-9 #[seconds]
 frequency = 3e9 #[Hz]
 
+# integration steps: (selection, step length [m], minimum number of steps)
+integ_steps_rules = (
+    (('CH', 'CV'), None, 5),
+    ('bend', 0.035, 10),
+    ('quadrupole', None, 10),
+    ('sextupole', None, 5),
+    ('other', None, 1),
+)
 
 
 def create_lattice(optics_mode = default_optics_mode, operation_mode = default_operation_mode):
@@ -233,32 +242,13 @@ def get_optics_mode(optics_mode):
 
 
 def set_num_integ_steps(the_line):
-
-    for i in range(len(the_line)):
-        if the_line[i].angle:
-            length = the_line[i].length
-            the_line[i].nr_steps = max(10, int(_math.ceil(length/0.035)))
-        elif the_line[i].polynom_b[1]:
-            the_line[i].nr_steps = 10
-        elif the_line[i].polynom_b[2]:
-            the_line[i].nr_steps = 5
-        else:
-            the_line[i].nr_steps = 1
-
-    ch_indices = _pyaccel.lattice.find_indices(the_line, 'fam_name', 'CH')
-    cv_indices = _pyaccel.lattice.find_indices(the_line, 'fam_name', 'CV')
-    corr_indices = ch_indices + cv_indices
-    for idx in corr_indices:
-        the_line[idx].nr_steps = 5
+    """Set number of integration steps in each lattice element."""
+    _utils.set_num_integ_steps(the_line, integ_steps_rules)
 
 
 def set_vacuum_chamber(the_line):
 
     # -- default physical apertures --
-    for i in range(len(the_line)):
-        the_line[i].hmin = -0.018
-        the_line[i].hmax = +0.018
-        the_line[i].vmin = -0.018
-        the_line[i].vmax = +0.018
+    _utils.set_vacuum_chamber(the_line, [-0.018, +0.018, -0.018, +0.018])
 
     return the_line
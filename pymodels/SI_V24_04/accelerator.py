@@ -1,30 +1,24 @@
 """Accelerator module."""
 
 import numpy as _np
-import pyaccel as _pyaccel
 from . import lattice as _lattice
+from ..SI_V25_01 import accelerator as _parent
+from ..SI_V25_01.accelerator import default_cavity_on, \
+    default_radiation_on, default_vchamber_on
 
-
-default_cavity_on = False
-default_radiation_on = False
-default_vchamber_on = False
+# files the models are built from; any change in them invalidates the cache
+sources = _parent.sources + [__file__, _lattice.__file__]
 
 
 def create_accelerator(optics_mode=_lattice.default_optics_mode,
-                       simplified=False):
-    """Create accelerator model."""
-    lattice = _lattice.create_lattice(mode=optics_mode,
-                                      simplified=simplified)
-    accelerator = _pyaccel.accelerator.Accelerator(
-        lattice=lattice,
-        energy=_lattice.energy,
-        harmonic_number=_lattice.harmonic_number,
-        cavity_on=default_cavity_on,
-        radiation_on=default_radiation_on,
-        vchamber_on=default_vchamber_on
-    )
-
-    return accelerator
+                       simplified=False, use_cache=False, fidelity=None):
+    """Create accelerator model.
+
+    Arguments are those of SI_V25_01 create_accelerator.
+    """
+    return _parent.build_accelerator(
+        _lattice, accelerator_data['lattice_version'], sources, optics_mode,
+        simplified, use_cache, fidelity)
 
 
 accelerator_data = dict()
@@ -11,6 +11,7 @@ from .families import family_mapping
 from .families import get_family_data
 from .families import get_girder_data
 from .families import get_section_name_mapping
+from .families import get_section_name_codes
 
 from .lattice import energy
 from .lattice import harmonic_number
@@ -3,6 +3,9 @@
 import numpy as _np
 import pyaccel as _pyaccel
 from . import lattice as _lattice
+from . import segmented_models as _segmented_models
+from .. import cache as _cache
+from .. import utils as _utils
 
 
 default_cavity_on = False
@@ -10,15 +13,55 @@ default_radiation_on = False
 default_vchamber_on = False
 
 
+# files the models are built from; any change in them invalidates the cache
+sources = [
+    __file__, _lattice.__file__, _segmented_models.__file__, _utils.__file__]
+
+
 def create_accelerator(optics_mode=_lattice.default_optics_mode,
-                       simplified=False):
-    """Create accelerator model."""
-    lattice = _lattice.create_lattice(mode=optics_mode,
-                                      simplified=simplified)
+                       simplified=False, use_cache=False, fidelity=None):
+    """Create accelerator model.
+
+    fidelity selects the level of the segmented magnet models (see
+    segmented_models.fidelity_levels). If use_cache is True the lattice is
+    loaded from the on-disk model cache (see pymodels.cache), being built and
+    stored there on the first call.
+    """
+    return build_accelerator(
+        _lattice, accelerator_data['lattice_version'], sources, optics_mode,
+        simplified, use_cache, fidelity)
+
+
+def build_accelerator(lattice_module, lattice_version, sources, optics_mode,
+                      simplified=False, use_cache=False, fidelity=None):
+    """Create accelerator model from the lattice module of a version.
+
+    Shared by SI_V25_01 and the versions declared as its overlays, whose
+    lattice modules have the create_lattice arguments of SI_V25_01. sources
+    are the files hashed in the cache key (see create_accelerator).
+    """
+    if use_cache:
+        fidelity = _segmented_models.get_fidelity(simplified, fidelity)
+        key = _cache.get_cache_key(
+            sources, lattice_version, optics_mode, fidelity)
+        accelerator = _cache.load_accelerator(lattice_version, key)
+        if accelerator is None:
+            accelerator = build_accelerator(
+                lattice_module, lattice_version, sources, optics_mode,
+                fidelity=fidelity)
+            _cache.save_accelerator(accelerator, lattice_version, key)
+        accelerator.energy = lattice_module.energy
+        accelerator.harmonic_number = lattice_module.harmonic_number
+        accelerator.cavity_on = default_cavity_on
+        accelerator.radiation_on = default_radiation_on
+        accelerator.vchamber_on = default_vchamber_on
+        return accelerator
+    lattice = lattice_module.create_lattice(
+        mode=optics_mode, simplified=simplified, fidelity=fidelity)
     accelerator = _pyaccel.accelerator.Accelerator(
         lattice=lattice,
-        energy=_lattice.energy,
-        harmonic_number=_lattice.harmonic_number,
+        energy=lattice_module.energy,
+        harmonic_number=lattice_module.harmonic_number,
         cavity_on=default_cavity_on,
         radiation_on=default_radiation_on,
         vchamber_on=default_vchamber_on
@@ -1,10 +1,15 @@
 """Element family definitions."""
 
-import pyaccel as _pyaccel
+import numpy as _np
 
+from .. import utils as _utils
+from .. import cache as _cache
+
+
+# dipoles, whose number of segments depends on the model fidelity
+_dipole_families = ('B1', 'B2', 'BC')
 
 _family_segmentation = {
-    'B1': 30, 'B2': 36, 'BC': 34,
     'QFA': 1, 'QDA': 1,
     'QFB': 1, 'QDB1': 1, 'QDB2': 1,
     'QFP': 1, 'QDP1': 1, 'QDP2': 1,
@@ -165,82 +170,97 @@ def families_ids():
     return ['APU22', 'APU58', ]
 
 
-def get_section_name_mapping(lattice):
-    """Return list with section name of each lattice element."""
-    lat = lattice[:]
-    section_map = ['' for i in range(len(lat))]
+def get_section_name_codes(lattice, fam_index=None):
+    """Return section name codes of the lattice elements.
+
+    Keyword argument:
+    lattice -- lattice model
+    fam_index -- optional pymodels.utils.LatticeIndex of the lattice
+
+    Returns int array with the code of each element and list of section
+    names, such that names[codes[i]] is the section name of element i.
+    """
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(lattice)
+    fam_index.check(lattice)
+    nr_eles = len(lattice)
 
     # find where the nomenclature starts counting and shift the lattice:
-    start = _pyaccel.lattice.find_indices(lat, 'fam_name', 'start')[0]
-    b1 = _pyaccel.lattice.find_indices(lat, 'fam_name', 'B1')
+    start = fam_index['start'][0]
+    b1 = fam_index['B1']
     if b1[0] > start:
-        ind_shift = (b1[-1] + 1)  # Next element of last b1
+        ind_shift = b1[-1] + 1  # Next element of last b1
     else:
-        for i in b1[::-1]:  # except there is a b1 before start
-            if i < start:
-                ind_shift = i + 1
-                break
-    lat = _pyaccel.lattice.shift(lat, ind_shift)
+        ind_shift = b1[b1 < start][-1] + 1  # except there is a b1 before start
+    lat = fam_index.shifted(ind_shift)
 
     # find indices important to define the change of the names of
     # the subsections.
-    b1 = _pyaccel.lattice.find_indices(lat, 'fam_name', 'B1')
+    b1, b2, bc, bpm = lat['B1'], lat['B2'], lat['BC'], lat['BPM']
     b1_nrsegs = len(b1)//40
-    b2 = _pyaccel.lattice.find_indices(lat, 'fam_name', 'B2')
-    # b2_nrsegs = len(b2)//40
-    bc = _pyaccel.lattice.find_indices(lat, 'fam_name', 'BC')
-    bpm = _pyaccel.lattice.find_indices(lat, 'fam_name', 'BPM')
 
     # divide the ring in 20 sectors defined by the b1 dipoles:
-    Sects = []
-    ini = 0
-    for i in range(len(b1)//(2*b1_nrsegs)):
-        fim = b1[(i+1)*2*b1_nrsegs-1] + 1
-        Sects.append(list(range(ini, fim)))
-        ini = fim
+    nr_sects = len(b1)//(2*b1_nrsegs)
+    sect_ends = b1[2*b1_nrsegs*_np.arange(1, nr_sects+1) - 1]
+    sect_inis = _np.r_[0, sect_ends[:-1] + 1]
+
+    # conditions that define change in subsection name:
+    def first(idx, nth=0):
+        return idx[_np.searchsorted(idx, sect_inis) + nth]
+
+    def last(idx):
+        return idx[_np.searchsorted(idx, sect_ends, side='right') - 1]
+
+    relev_inds = _np.column_stack([
+        first(b1) - 1, last(b1),  # define changes to C1
+        first(b2) - 1, last(b2),  # define changes to C2 and C4
+        first(bc) - 1, last(bc),  # define changes to BC and C3
+        first(bpm), first(bpm, 1) - 1,  # define changes to SX and M2
+        ])
+    sector, subsec = _utils.get_subsection_codes(
+        nr_eles, sect_ends, relev_inds)
 
     # Names of the subsections:
     sub_secs = ['M1', 'SX', 'M2', 'C1', 'C2', 'BC', 'C3', 'C4']
     symm = ['SA', 'SB', 'SP', 'SB']
+    names = ['']
+    for i in range(1, nr_sects+1):
+        for sub in sub_secs:
+            sub = symm[(i-1) % len(symm)] if sub == 'SX' else sub
+            names.append('{0:02d}'.format(i) + sub)
+
+    codes = _np.zeros(nr_eles, dtype=int)
+    sel = sector >= 0
+    codes[sel] = 1 + _np.ravel_multi_index(
+        (sector[sel], subsec[sel]), (nr_sects, len(sub_secs)))
+    codes = _np.roll(codes, ind_shift)
+    return codes, names
+
+
+def get_section_name_mapping(lattice, fam_index=None):
+    """Return list with section name of each lattice element.
 
-    for i, sec in enumerate(Sects, 1):
-        # conditions that define change in subsection name:
-        # define changes to C1
-        sec_b1 = [x for x in b1 if sec[0] <= x <= sec[-1]]
-        relev_inds = [sec_b1[0]-1, sec_b1[-1]]
-        # define changes to C2 and C4:
-        sec_b2 = [x for x in b2 if sec[0] <= x <= sec[-1]]
-        relev_inds += [sec_b2[0]-1, sec_b2[-1]]
-        # define changes to BC and C3
-        sec_bc = [x for x in bc if sec[0] <= x <= sec[-1]]
-        relev_inds += [sec_bc[0]-1, sec_bc[-1]]
-        # define changes to SX and M2
-        sec_bpm = [x for x in bpm if sec[0] <= x <= sec[-1]]
-        relev_inds += [sec_bpm[0], sec_bpm[1]-1]
-        relev_inds.sort()
-        # fill the section_map variable
-        ref = 0
-        for j in sec:
-            section_map[(ind_shift+j) % len(lat)] = "{0:02d}".format(i)
-            section_map[(ind_shift+j) % len(lat)] += \
-                symm[(i-1) % len(symm)] if sub_secs[ref] == 'SX' else \
-                sub_secs[ref]
-            if j >= relev_inds[ref]:
-                ref += 1
-
-    return section_map
-
-
-def get_family_data(lattice):
+    fam_index is an optional pymodels.utils.LatticeIndex of the lattice.
+    """
+    codes, names = get_section_name_codes(lattice, fam_index)
+    return _np.array(names, dtype=object)[codes].tolist()
+
+
+@_cache.memoize_by_structure('SI_V25_01')
+def get_family_data(lattice, fam_index=None):
     """Get pyaccel lattice model index and segmentation for family names.
 
     Keyword argument:
     lattice -- lattice model
+    fam_index -- optional pymodels.utils.LatticeIndex of the lattice
 
-    Returns dict.
+    Returns dict. The result is memoized by the structure of the lattice;
+    each call returns a copy of it, which may be modified.
     """
-    latt_dict = _pyaccel.lattice.find_dict(lattice, 'fam_name')
-    section_map = get_section_name_mapping(lattice)
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(lattice)
+    latt_dict = fam_index.find_dict()
+    section_map = get_section_name_mapping(lattice, fam_index)
 
     def get_idx(x):
         return x[len(x)//2]
@@ -249,6 +269,9 @@ def get_family_data(lattice):
     # fill the data dictionary with index info ######
     data = {}
     for key, idx in latt_dict.items():
+        if key in _dipole_families:
+            data[key] = _get_magnets_segments(lattice, idx)
+            continue
         nr = _family_segmentation.get(key)
         if nr is None:
             continue
@@ -333,7 +356,7 @@ def get_family_data(lattice):
     data['ID'] = sorted(idx, key=get_idx)
 
     # Girders
-    girder = get_girder_data(lattice)
+    girder = get_girder_data(lattice, fam_index)
     if girder is not None:
         data['girder'] = girder
 
@@ -365,13 +388,30 @@ def get_family_data(lattice):
     return new_data
 
 
-def get_girder_data(lattice):
+def _get_magnets_segments(lattice, idx):
+    """Group indices of segments by magnet.
+
+    Consecutive segments separated only by elements of zero length (edges
+    and markers) belong to the same magnet.
+    """
+    magnets = [[idx[0]]] if idx else []
+    for prev, curr in zip(idx[:-1], idx[1:]):
+        if all(lattice[i].length == 0 for i in range(prev+1, curr)):
+            magnets[-1].append(curr)
+        else:
+            magnets.append([curr])
+    return magnets
+
+
+def get_girder_data(lattice, fam_index=None):
     """Return girder data.
 
     List of dicts, one for each girder, containing index of elements in that
     girder.
     """
-    gir = _pyaccel.lattice.find_indices(lattice, 'fam_name', 'girder')
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(lattice)
+    gir = fam_index.find_indices('girder')
     if not gir:
         return None
     gir_ini = gir[0::2]
@@ -3,7 +3,6 @@
 In this module the lattice of the corresponding accelerator is defined.
 """
 
-import math as _math
 import numpy as _np
 
 import lnls as _lnls
@@ -12,17 +11,52 @@ from pyaccel import lattice as _pyacc_lat, elements as _pyacc_ele, \
     accelerator as _pyacc_acc
 
 from . import segmented_models as _segmented_models
+from .. import utils as _utils
 
 default_optics_mode = 'S05.01'
 lattice_symmetry = 5
 harmonic_number = 864
 energy = 3e9  # [eV]
 
-
-def create_lattice(mode=default_optics_mode, simplified=False):
-    """Return lattice object."""
+# integration steps: (selection, step length [m], minimum number of steps)
+integ_steps_rules = (
+    ('bend', 0.050, 0),
+    ('sextupole', 0.015, 0),
+    ('quadrupole', 0.015, 0),
+    (('FC1', 'FC2', 'InjDpKckr', 'InjNLKckr'), 0.015, 0),
+)
+
+# circumference change [m] with respect to the nominal lattice, distributed
+# in the straight sections around the injection and the high beta sections
+dcircum = 518.3899 - 518.3960
+
+
+def create_lattice(mode=default_optics_mode, simplified=False, fidelity=None,
+                   dipole_models=None, dcircum=dcircum, strengths=None,
+                   quadrupole_errors=None, reference=None):
+    """Return lattice object.
+
+    fidelity selects the level of the segmented magnet models, one of
+    segmented_models.fidelity_levels. If None, it is 'fast' for simplified
+    lattices and 'full' otherwise. dipole_models optionally maps 'BC', 'B1'
+    and 'B2' to names of alternate segmented models (see
+    segmented_models.get_segmodel). dcircum and strengths (dict of magnet
+    strengths, by default those of the optics mode) allow lattice versions
+    to be declared as deltas of this one. quadrupole_errors optionally maps
+    quadrupole family names to relative strength errors, applied to all
+    magnets of the family (e.g. systematic excitation errors); errors of
+    individual magnets are applied to the built lattice. If reference, a
+    lattice with the same structure, is given, the settings delta of the
+    lattice to it is returned instead of the lattice (see
+    utils.get_settings_delta), so variants can be held as deltas of one
+    shared reference lattice.
+    """
     # -- selection of optics mode --
-    strengths = get_optics_mode(mode=mode)
+    if strengths is None:
+        strengths = get_optics_mode(mode=mode)
+    fidelity = _segmented_models.get_fidelity(simplified, fidelity)
+    dipole_models = dict(dipole_models or dict())
+    quadrupole_errors = dict(quadrupole_errors or dict())
 
     # -- shortcut symbols --
     marker = _pyacc_ele.marker
@@ -33,8 +67,6 @@ def create_lattice(mode=default_optics_mode, simplified=False):
     # -- lattice markers --
     m_accep_fam_name = 'calc_mom_accep'
 
-    dcircum = 518.3899 - 518.3960
-
     # -- drifts --
     LKK = drift('lkk', 1.9150)
     LIA = drift('lia', 1.5179)
@@ -86,27 +118,25 @@ def create_lattice(mode=default_optics_mode, simplified=False):
     L715 = drift('l715', 0.715)
 
     # -- dipoles --
-    BC = _segmented_models.dipole_bc(m_accep_fam_name, simplified)
-    B1 = _segmented_models.dipole_b1(m_accep_fam_name, simplified)
-    B2 = _segmented_models.dipole_b2(m_accep_fam_name, simplified)
+    BC = _segmented_models.dipole_bc(
+        m_accep_fam_name, fidelity=fidelity,
+        segmodel=dipole_models.get('BC', 'BC'))
+    B1 = _segmented_models.dipole_b1(
+        m_accep_fam_name, fidelity=fidelity,
+        segmodel=dipole_models.get('B1', 'B1'))
+    B2 = _segmented_models.dipole_b2(
+        m_accep_fam_name, fidelity=fidelity,
+        segmodel=dipole_models.get('B2', 'B2'))
 
     # -- quadrupoles --
-    QFA = _segmented_models.quadrupole_q20('QFA', strengths['QFA'], simplified)
-    QDA = _segmented_models.quadrupole_q14('QDA', strengths['QDA'], simplified)
-    QDB2 = _segmented_models.quadrupole_q14('QDB2', strengths['QDB2'],
-                                            simplified)
-    QFB = _segmented_models.quadrupole_q30('QFB', strengths['QFB'], simplified)
-    QDB1 = _segmented_models.quadrupole_q14('QDB1', strengths['QDB1'],
-                                            simplified)
-    QDP2 = _segmented_models.quadrupole_q14('QDP2', strengths['QDP2'],
-                                            simplified)
-    QFP = _segmented_models.quadrupole_q30('QFP', strengths['QFP'], simplified)
-    QDP1 = _segmented_models.quadrupole_q14('QDP1', strengths['QDP1'],
-                                            simplified)
-    Q1 = _segmented_models.quadrupole_q20('Q1', strengths['Q1'], simplified)
-    Q2 = _segmented_models.quadrupole_q20('Q2', strengths['Q2'], simplified)
-    Q3 = _segmented_models.quadrupole_q20('Q3', strengths['Q3'], simplified)
-    Q4 = _segmented_models.quadrupole_q20('Q4', strengths['Q4'], simplified)
+    QDA, QDB2, QDB1, QDP2, QDP1 = _create_quadrupoles(
+        'q14', ('QDA', 'QDB2', 'QDB1', 'QDP2', 'QDP1'), strengths,
+        quadrupole_errors, fidelity)
+    QFA, Q1, Q2, Q3, Q4 = _create_quadrupoles(
+        'q20', ('QFA', 'Q1', 'Q2', 'Q3', 'Q4'), strengths,
+        quadrupole_errors, fidelity)
+    QFB, QFP = _create_quadrupoles(
+        'q30', ('QFB', 'QFP'), strengths, quadrupole_errors, fidelity)
 
     # -- sextupoles --
     SDA0 = sextupole('SDA0', 0.150, strengths['SDA0'])  # CH-CV
@@ -213,8 +243,11 @@ def create_lattice(mode=default_optics_mode, simplified=False):
     # SS_S13 = IDA_BbBKckrH
     # SS_S17 = IDA17
 
-    L500p = drift('L500p', 0.5000 + dcircum/5/2)
-    LKKp = drift('lkkp', 1.9150 + dcircum/5/2)
+    if dcircum:
+        L500p = drift('L500p', 0.5000 + dcircum/5/2)
+        LKKp = drift('lkkp', 1.9150 + dcircum/5/2)
+    else:
+        L500p, LKKp = L500, LKK
 
     IDA = [
         L500, LIA, L500, MIDA, L500, L500, MIA, L500, L500, MIDA, L500, LIA,
@@ -571,59 +604,86 @@ def create_lattice(mode=default_optics_mode, simplified=False):
 
     anel = [S01, S02, S03, S04, S05, S06, S07, S08, S09, S10,
             S11, S12, S13, S14, S15, S16, S17, S18, S19, S20]
-    anel = _lnls.utils.flatten(anel)
 
-    the_ring = _pyacc_lat.build(anel)
+    the_ring = _build_from_templates(anel)
+    fam_index = _utils.LatticeIndex(the_ring)
 
     # -- shifts model to marker 'start'
-    idx = _pyacc_lat.find_indices(the_ring, 'fam_name', 'start')
-    the_ring = _pyacc_lat.shift(the_ring, idx[0])
+    the_ring = fam_index.shift(the_ring, fam_index['start'][0])
 
     # -- sets rf frequency
-    set_rf_frequency(the_ring)
+    set_rf_frequency(the_ring, fam_index=fam_index)
 
     # -- sets number of integration steps
     set_num_integ_steps(the_ring)
 
     # -- define vacuum chamber for all elements
-    the_ring = set_vacuum_chamber(the_ring)
+    the_ring = set_vacuum_chamber(the_ring, fam_index=fam_index)
 
+    if reference is not None:
+        return _utils.get_settings_delta(the_ring, reference)
     return the_ring
 
 
-def set_rf_frequency(the_ring):
-    """Set RF frequency of the lattice."""
+def _create_quadrupoles(model_type, fam_names, strengths, errors, fidelity):
+    return _segmented_models.quadrupoles(
+        model_type, fam_names, [strengths[fam] for fam in fam_names],
+        errors=[errors.get(fam, 0.0) for fam in fam_names],
+        fidelity=fidelity)
+
+
+def _build_from_templates(sectors):
+    """Build lattice replicating flattened girder templates.
+
+    Sectors are lists of girders (M1A, IDB, C4B_DCCT, B1, ...) that are
+    shared between sectors. Each distinct girder is flattened only once and
+    the ring is stamped out by concatenating these templates, so the cost of
+    flattening scales with the number of distinct girders.
+    """
+    templates = dict()
+    elist = []
+    for sector in sectors:
+        for girder in sector:
+            template = templates.get(id(girder))
+            if template is None:
+                template = _lnls.utils.flatten(girder)
+                templates[id(girder)] = template
+            elist.extend(template)
+    return _pyacc_lat.build(elist)
+
+
+def set_rf_frequency(the_ring, fam_index=None):
+    """Set RF frequency of the lattice.
+
+    fam_index is an optional pymodels.utils.LatticeIndex of the_ring.
+    """
     circumference = _pyacc_lat.length(the_ring)
     # _, beam_velocity, _, _, _ = _mp.beam_optics.beam_rigidity(energy=energy)
     # velocity = beam_velocity
     velocity = _mp.constants.light_speed
     rev_frequency = velocity / circumference
     rf_frequency = harmonic_number * rev_frequency
-    idx = _pyacc_lat.find_indices(the_ring, 'fam_name', 'SRFCav')
-    for i in idx:
-        the_ring[i].frequency = rf_frequency
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(the_ring)
+    fam_index.check(the_ring)
+    for i in fam_index['SRFCav']:
+        the_ring[int(i)].frequency = rf_frequency
 
 
 def set_num_integ_steps(the_ring):
     """Set number of integration steps in each lattice element."""
-    len_bends = 0.050
-    len_quads = 0.015
-    len_sexts = 0.015
-    for i in range(len(the_ring)):
-        if the_ring[i].angle:
-            nr_steps = int(_math.ceil(the_ring[i].length/len_bends))
-            the_ring[i].nr_steps = nr_steps
-        elif the_ring[i].polynom_b[2]:
-            nr_steps = int(_math.ceil(the_ring[i].length/len_sexts))
-            the_ring[i].nr_steps = nr_steps
-        elif the_ring[i].polynom_b[1] or the_ring[i].fam_name in \
-                ['FC1', 'FC2', 'InjDpKckr', 'InjNLKckr']:
-            nr_steps = int(_math.ceil(the_ring[i].length/len_quads))
-            the_ring[i].nr_steps = nr_steps
-
-
-def set_vacuum_chamber(the_ring, mode=default_optics_mode):
-    """Set vacuum chamber for all elements."""
+    _utils.set_num_integ_steps(the_ring, integ_steps_rules)
+
+
+def set_vacuum_chamber(the_ring, mode=default_optics_mode, fam_index=None):
+    """Set vacuum chamber for all elements.
+
+    fam_index is an optional pymodels.utils.LatticeIndex of the_ring.
+    """
+    if fam_index is None:
+        fam_index = _utils.LatticeIndex(the_ring)
+    fam_index.check(the_ring)
+
     # vchamber = [hmin, hmax, vmin, vmax] (meter)
     other_vchamber = [-0.012, 0.012, -0.012, 0.012]
     idb_vchamber = [-0.004, 0.004, -0.00225, 0.00225]
@@ -632,75 +692,34 @@ def set_vacuum_chamber(the_ring, mode=default_optics_mode):
     inj_vchamber = [-0.030, 0.012, -0.012, 0.012]
     idp_vchamber = idb_vchamber if mode.startswith('S05') else ida_vchamber
 
-    # Set ordinary Vacuum Chamber
-    for i in range(len(the_ring)):
-        e = the_ring[i]
-        e.hmin, e.hmax, e.vmin, e.vmax = other_vchamber
-
-    # Shift the ring so that lattice does not begin between id markers
-    bpm = _pyacc_lat.find_indices(the_ring, 'fam_name', 'BPM')
-    the_ring = _pyacc_lat.shift(the_ring, bpm[0])
-
-    # NOTE: Insertion devices vchamber temporarily off
-
-    # # Set in-vacuum ids vacuum chamber
-    # idb = _pyacc_lat.find_indices(the_ring, 'fam_name', 'id_endb')
-    # print(idb)
-    # idb_list = []
-    # for i in range(len(idb)//2):
-    #     idb_list.extend(range(idb[2*i], idb[2*i+1]+1))
-    # print(idb_list)
-    # for i in idb_list:
-    #     e = the_ring[i]
-    #     e.hmin, e.hmax, e.vmin, e.vmax = idb_vchamber
-
-    # # Set other ids vacuum chamber
-    # ida = _pyacc_lat.find_indices(the_ring, 'fam_name', 'id_enda')
-    # ida_list = []
-    # for i in range(len(ida)//2):
-    #     ida_list.extend(range(ida[2*i], ida[2*i+1]+1))
-    # for i in ida_list:
-    #     e = the_ring[i]
-    #     e.hmin, e.hmax, e.vmin, e.vmax = ida_vchamber
-
-    # # Set other ids vacuum chamber
-    # idp = _pyacc_lat.find_indices(the_ring, 'fam_name', 'id_endp')
-    # idp_list = []
-    # for i in range(len(idp)//2):
-    #     idp_list.extend(range(idp[2*i], idp[2*i+1]+1))
-    # for i in idp_list:
-    #     e = the_ring[i]
-    #     e.hmin, e.hmax, e.vmin, e.vmax = idp_vchamber
-
-    # Shift the ring back.
-    the_ring = _pyacc_lat.shift(the_ring, len(the_ring)-bpm[0])
-
-    # Set injection vacuum chamber
-    sept_in = _pyacc_lat.find_indices(the_ring, 'fam_name', 'InjSeptF')[-1]
-    kick_in = _pyacc_lat.find_indices(the_ring, 'fam_name', 'InjDpKckr')[0]
-    inj_list = list(range(sept_in, len(the_ring))) + list(range(kick_in+1))
-    for i in inj_list:
-        e = the_ring[i]
-        e.hmin, e.hmax, e.vmin, e.vmax = inj_vchamber
-
-    # Set high field BC vacuum chamber
+    # NOTE: Insertion devices vchamber temporarily off. When turned on,
+    # idb_vchamber, ida_vchamber and idp_vchamber are to be set in the
+    # regions delimited by pairs of 'id_endb', 'id_enda' and 'id_endp'
+    # markers, respectively.
+
+    # injection region: from septum to injection kicker, across model start
+    sept_in = fam_index['InjSeptF'][-1]
+    kick_in = fam_index['InjDpKckr'][0]
+    inj_region = _np.r_[sept_in:len(the_ring), :kick_in+1]
+
+    # high field BC region
     # NOTE: segments with bending radius smaller than this value
     # are supposed to have reduced vacuum chamber. This should be
     # replaced by specification of the vacuum chamber
     rho0 = 5.0  # [m]
-    indices = _pyacc_lat.find_indices(the_ring, 'fam_name', 'BC')
-    for i in indices:
-        e = the_ring[i]
-        ang, lng = e.angle, e.length
-        rho = lng/ang
-        if rho < rho0:
-            e.hmin, e.hmax, e.vmin, e.vmax = bc_hfield_vchamber
-    indices = _pyacc_lat.find_indices(the_ring, 'fam_name', 'mc')
-    for i in indices:
-        e = the_ring[i]
-        e.hmin, e.hmax, e.vmin, e.vmax = bc_hfield_vchamber
-        e = the_ring[i + 1]
-        e.hmin, e.hmax, e.vmin, e.vmax = bc_hfield_vchamber
+    bc = fam_index['BC']
+    ang = _np.asarray(
+        _pyacc_lat.get_attribute(the_ring, 'angle', bc.tolist()))
+    lng = _np.asarray(
+        _pyacc_lat.get_attribute(the_ring, 'length', bc.tolist()))
+    mc = fam_index['mc']
+    bc_hfield_region = _np.r_[bc[lng/ang < rho0], mc, mc + 1]
+
+    regions = [
+        (inj_region, inj_vchamber),
+        (bc_hfield_region, bc_hfield_vchamber),
+    ]
+    _utils.set_vacuum_chamber(the_ring, other_vchamber, regions)
 
     return the_ring
 
@@ -1,32 +1,45 @@
 """Segmented models of the lattice."""
 
-import math as _math
+import os as _os
+
 import numpy as _np
 import pyaccel as _pyaccel
 
-
-def dipole_bc(m_accep_fam_name, simplified=False):
-    """Segmented BC dipole model."""
-    segtypes = {
-        'BC': ('BC', _pyaccel.elements.rbend),
-        'BC_EDGE': ('BC_EDGE', _pyaccel.elements.marker),
-        'mc': ('mc', _pyaccel.elements.marker),
-        'm_accep': (m_accep_fam_name, _pyaccel.elements.marker),
-    }
-
-    # Average Dipole Model for BC
-    # =============================================
-    # date: 2019-06-27
-    # Based on multipole expansion around average segmented model trajectory calculated
-    # from fieldmap analysis of measurement data
-    # folder = si-dipoles-bc/model-13/analysis/hallprobe/production/x0-0p079mm-reftraj
-    # init_rx =  79 um
-    # ref_rx  = 7.7030 mm (average model trajectory)
-    # goal_tunes = [49.096188917357331, 14.151971558423915];
-    # goal_chrom = [2.549478494984214, 2.527086095938103];
-
-    monomials = [0, 1, 2, 3, 4, 5, 6, 7, 8, 10]
-    segmodel = [
+from .. import utils as _utils
+
+
+# fidelity levels of the segmented models, from the most to the least
+# accurate: 'full' uses the fieldmap segmentation, 'medium' merges adjacent
+# dipole segments with similar multipole content and drops negligible
+# octupole and higher multipoles at the reference radius, 'fast' collapses
+# dipoles into at most three rbends and truncates quadrupole polynoms to 3
+# terms.
+fidelity_levels = ('full', 'medium', 'fast')
+medium_fidelity_r0 = 0.012  # [m] reference radius
+medium_fidelity_tolerance = 1e-2  # relative to nominal dipole curvature
+medium_fidelity_threshold = 1e-3  # relative to main field at r0
+# polynom terms always kept by the medium level: dipole, quadrupole and
+# sextupole, which set the linear optics and the chromaticity
+medium_fidelity_min_terms = 3
+
+# folder of alternate dipole models (e.g. of individual magnets) stored as
+# binary tables, see get_segmodel.
+segmodels_dir = _os.path.join(_os.path.dirname(__file__), 'segmodels')
+
+
+# Average Dipole Model for BC
+# =============================================
+# date: 2019-06-27
+# Based on multipole expansion around average segmented model trajectory calculated
+# from fieldmap analysis of measurement data
+# folder = si-dipoles-bc/model-13/analysis/hallprobe/production/x0-0p079mm-reftraj
+# init_rx =  79 um
+# ref_rx  = 7.7030 mm (average model trajectory)
+# goal_tunes = [49.096188917357331, 14.151971558423915];
+# goal_chrom = [2.549478494984214, 2.527086095938103];
+_bc_table = _utils.get_segmodel_table(
+    monomials=[0, 1, 2, 3, 4, 5, 6, 7, 8, 10],
+    segmodel=[
      #         len[m]  angle[deg]  PolyB(n=0)   PolyB(n=1)   PolyB(n=2)   PolyB(n=3)   PolyB(n=4)   PolyB(n=5)   PolyB(n=6)   PolyB(n=7)   PolyB(n=8)   PolyB(n=10)
         ['BC', 0.00100, 0.01877, -1.4741e-05, -3.2459e-03, -2.5934e+01, +2.2655e+02, -4.2041e+05, -1.9362e+06, -8.8515e+08, +1.8066e+10, -4.1927e+13, +1.8535e+17],
         ['BC', 0.00400, 0.07328, -3.5868e-06, -8.0872e-03, -2.3947e+01, +1.9896e+02, -3.8312e+05, -1.5555e+06, -8.7538e+08, +1.5588e+10, -3.4411e+13, +1.5036e+17],
@@ -48,90 +61,20 @@ def dipole_bc(m_accep_fam_name, simplified=False):
         ['BC', 0.01400, 0.03339, -4.4895e-07, -4.4684e-01, -1.8750e+00, +2.2077e+01, -5.5912e+03, -1.6748e+05, +1.0327e+08, +9.3221e+08, -8.6332e+11, +2.7550e+15],
         ['BC', 0.01600, 0.01935, +7.1551e-07, -1.1215e-01, -1.9597e+00, +1.3313e+01, -3.5424e+03, -1.6337e+05, +6.3653e+07, +8.9179e+08, -5.4044e+11, +1.7393e+15],
         ['BC', 0.03500, 0.01344, -1.7487e-07, -1.9828e-02, -1.2534e+00, +1.9342e+01, +2.8084e+03, -2.9546e+05, -5.0640e+07, +1.4694e+09, +4.0940e+11, -1.2172e+15]
-    ]
-
-    # turns deflection angle error off (convenient for having a nominal model
-    # with zero 4d closed orbit)
-    for i in range(len(segmodel)):
-        segmodel[i][3] = 0.0
-
-    model = []
-
-    # --- creates half model ---
-    d2r = _math.pi/180.0
-    PolyB = _np.zeros(1+max(monomials))
-    for i in range(len(segmodel)):
-        fam_name, element_type = segtypes[segmodel[i][0]]
-        if element_type == _pyaccel.elements.rbend:
-            for j in range(len(monomials)):
-                PolyB[monomials[j]] = segmodel[i][j+3]
-            PolyA = 0 * PolyB
-            element = element_type(fam_name=fam_name, length=segmodel[i][1],
-                                   angle=d2r * segmodel[i][2],
-                                   angle_in=0, angle_out=0,
-                                   gap=0, fint_in=0, fint_out=0,
-                                   polynom_a=PolyA, polynom_b=PolyB)
-        else:
-            element = element_type(fam_name)
-        model.append(element)
-
-    # --- adds additional markers ---
-    mc = segtypes['mc'][1](segtypes['mc'][0])
-    maccep = segtypes['m_accep'][1](segtypes['m_accep'][0])
-    model = model[::-1] + [mc, maccep] + model
-
-    if simplified:
-        m_accep = _pyaccel.elements.marker(m_accep_fam_name)
-        le = sum([s[1] for s in segmodel[:8]])
-        ang1 = sum([s[2] for s in segmodel[:8]]) * d2r
-        k = sum([s[4]*s[1] for s in segmodel[:8]])/le
-        s = sum([s[5]*s[1] for s in segmodel[:8]])/le
-        el = _pyaccel.elements.rbend(fam_name='BC', length=2*le, angle=2*ang1,
-                                     angle_in=0, angle_out=0,
-                                     gap=0, fint_in=0, fint_out=0,
-                                     polynom_a=[0, 0, 0], polynom_b=[0, k, s])
-        le = sum([s[1] for s in segmodel[9:14]])
-        ang2 = sum([s[2] for s in segmodel[9:]]) * d2r
-        k = sum([s[4]*s[1] for s in segmodel[9:]])/le
-        s = sum([s[5]*s[1] for s in segmodel[9:]])/le
-        el_e = _pyaccel.elements.rbend(
-            fam_name='BC', length=le, angle=ang2,
-            angle_in=0, angle_out=0*ang2,
-            gap=0, fint_in=0, fint_out=0,
-            polynom_a=[0, 0, 0], polynom_b=[0, k, s])
-        el_b = _pyaccel.elements.rbend(
-            fam_name='BC', length=le, angle=ang2,
-            angle_in=0*ang2, angle_out=0,
-            gap=0, fint_in=0, fint_out=0,
-            polynom_a=[0, 0, 0], polynom_b=[0, k, s])
-        l2 = sum([s[1] for s in segmodel[14:]])
-        dr = _pyaccel.elements.drift('LBC', l2)
-        model = [dr, el_b, m_accep, el, m_accep, el_e, dr]
-
-    return model
-
-
-def dipole_b1(m_accep_fam_name, simplified=False):
-    """Segmented B1 dipole model."""
-    segtypes = {
-        'B1': ('B1', _pyaccel.elements.rbend),
-        'B1_EDGE': ('B1_EDGE', _pyaccel.elements.marker),
-        'mb1': ('mb1', _pyaccel.elements.marker),
-        'm_accep': (m_accep_fam_name, _pyaccel.elements.marker),
-    }
-
-    # Average Dipole Model for B1 at current 403p6A
-    # =============================================
-    # date: 2019-01-30
-    # Based on multipole expansion around average segmented model trajectory
-    # calculated from fieldmap analysis of measurement data
-    # init_rx =  8.527 mm
-    # ref_rx  = 13.693 mm (average model trajectory)
-    # goal_tunes = [49.096188917357331, 14.151971558423915];
-    # goal_chrom = [2.549478494984214, 2.527086095938103];
-
-    monomials = [0, 1, 2, 3, 4, 5, 6]
-    segmodel = [
+    ])
+
+# Average Dipole Model for B1 at current 403p6A
+# =============================================
+# date: 2019-01-30
+# Based on multipole expansion around average segmented model trajectory
+# calculated from fieldmap analysis of measurement data
+# init_rx =  8.527 mm
+# ref_rx  = 13.693 mm (average model trajectory)
+# goal_tunes = [49.096188917357331, 14.151971558423915];
+# goal_chrom = [2.549478494984214, 2.527086095938103];
+_b1_table = _utils.get_segmodel_table(
+    monomials=[0, 1, 2, 3, 4, 5, 6],
+    segmodel=[
         # type     len[m]   angle[deg]  PolyB(n=0)   PolyB(n=1)   PolyB(n=2)   PolyB(n=3)   PolyB(n=4)   PolyB(n=5)   PolyB(n=6)
         ['B1', 0.00200, 0.00633, -1.9696e-06, -7.2541e-01, -5.4213e-01, +5.4347e+00, +2.5091e+02, +4.9772e+02, -1.9113e+06],
         ['B1', 0.00300, 0.00951, -3.8061e-06, -7.2968e-01, -4.5292e-01, +4.3822e+00, +3.1863e+02, +1.5282e+03, -2.3387e+06],
@@ -150,76 +93,20 @@ def dipole_b1(m_accep_fam_name, simplified=False):
         ['B1', 0.04000, 0.00774, -1.6259e-07, -8.3065e-03, -3.8990e-01, +1.3183e+00, +2.5814e+01, +3.1642e+02, -5.0464e+04],
         ['B1', 0.05000, 0.00389, -7.9445e-08, -1.0742e-03, -9.8271e-02, +5.0359e-02, -1.0312e+01, +9.0013e+02, +8.2477e+04],
         ['m_accep', 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-    ]
-
-    # turns deflection angle error off (convenient for having a nominal model
-    # with zero 4d closed orbit)
-    for i in range(len(segmodel)):
-        segmodel[i][3] = 0.0
-
-    model = []
-
-    # --- creates half model ---
-    d2r = _math.pi/180.0
-    PolyB = _np.zeros(1+max(monomials))
-    for i in range(len(segmodel)):
-        fam_name, element_type = segtypes[segmodel[i][0]]
-        if element_type == _pyaccel.elements.rbend:
-            for j in range(len(monomials)):
-                PolyB[monomials[j]] = segmodel[i][j+3]
-            PolyA = 0 * PolyB
-            element = element_type(fam_name=fam_name, length=segmodel[i][1],
-                                   angle=d2r * segmodel[i][2],
-                                   angle_in=0, angle_out=0,
-                                   gap=0, fint_in=0, fint_out=0,
-                                   polynom_a=PolyA, polynom_b=PolyB)
-        else:
-            element = element_type(fam_name)
-        model.append(element)
-
-    # --- adds additional markers ---
-    mb1 = segtypes['mb1'][1](segtypes['mb1'][0])
-    maccep = segtypes['m_accep'][1](segtypes['m_accep'][0])
-    model = model[::-1] + [mb1, maccep] + model
-
-    if simplified:
-        le = sum([s[1] for s in segmodel[:12]])
-        ang = sum([s[2] for s in segmodel]) * d2r
-        k = sum([s[4]*s[1] for s in segmodel])/le
-        s = sum([s[5]*s[1] for s in segmodel])/le
-        el = _pyaccel.elements.rbend(
-            fam_name='B1', length=2*le, angle=2*ang,
-            angle_in=0*ang, angle_out=0*ang,
-            gap=0, fint_in=0, fint_out=0,
-            polynom_a=[0, 0, 0], polynom_b=[0, k, s])
-        l2 = sum([s[1] for s in segmodel[12:]])
-        dr = _pyaccel.elements.drift('LB1', l2)
-        model = [dr, el, dr]
-
-    return model
-
-
-def dipole_b2(m_accep_fam_name, simplified=False):
-    """Segmented B2 dipole model."""
-    segtypes = {
-        'B2': ('B2', _pyaccel.elements.rbend),
-        'B2_EDGE': ('B2_EDGE', _pyaccel.elements.marker),
-        'mb2': ('mb2', _pyaccel.elements.marker),
-        'm_accep': (m_accep_fam_name, _pyaccel.elements.marker),
-    }
-
-    #  Average Dipole Model for B2 at current 401p8A
-    #  =============================================
-    #  date: 2019-01-30
-    #  Based on multipole expansion around average segmented model trajectory calculated
-    #  from fieldmap analysis of measurement data
-    #  init_rx =  8.153 mm
-    #  ref_rx  = 19.428 mm (average model trajectory)
-    #  goal_tunes = [49.096188917357331, 14.151971558423915];
-    #  goal_chrom = [2.549478494984214, 2.527086095938103];
-
-    monomials = [0, 1, 2, 3, 4, 5, 6]
-    segmodel = [
+    ])
+
+#  Average Dipole Model for B2 at current 401p8A
+#  =============================================
+#  date: 2019-01-30
+#  Based on multipole expansion around average segmented model trajectory calculated
+#  from fieldmap analysis of measurement data
+#  init_rx =  8.153 mm
+#  ref_rx  = 19.428 mm (average model trajectory)
+#  goal_tunes = [49.096188917357331, 14.151971558423915];
+#  goal_chrom = [2.549478494984214, 2.527086095938103];
+_b2_table = _utils.get_segmodel_table(
+    monomials=[0, 1, 2, 3, 4, 5, 6],
+    segmodel=[
         #type     len[m]   angle[deg]  PolyB(n=0)   PolyB(n=1)   PolyB(n=2)   PolyB(n=3)   PolyB(n=4)   PolyB(n=5)   PolyB(n=6)
         ['B2', 0.12500, 0.40623, +2.8141e-07, -7.7535e-01, +3.8504e-02, +1.7048e+00, -2.6809e+02, +8.8090e+03, +1.8541e+06],
         ['B2', 0.05500, 0.17963, +2.4869e-07, -7.7400e-01, +1.8903e-02, +1.3538e+00, -2.7871e+02, +8.4667e+03, +1.7913e+06],
@@ -242,194 +129,368 @@ def dipole_b2(m_accep_fam_name, simplified=False):
         ['B2', 0.03200, 0.00444, -2.8999e-07, -4.5556e-03, -2.6166e-01, +7.8754e-01, +1.5573e+00, +8.3579e+01, +3.8831e+04],
         ['B2', 0.03250, 0.00341, -1.3468e-07, -1.2481e-03, -1.3069e-01, +3.6679e-01, +1.3671e+01, -7.7370e+02, -2.9544e+04],
         ['m_accep', 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-    ]
+    ])
 
-    # turns deflection angle error off (convenient for having a nominal model
-    # with zero 4d closed orbit)
-    for i in range(len(segmodel)):
-        segmodel[i][3] = 0.0
+_segmodels = {'BC': _bc_table, 'B1': _b1_table, 'B2': _b2_table}
 
-    model = []
+
+# Quadrupole (half) models with a single hard-edge segment. They are
+# rescaled to the strength of each magnet by quadrupoles.
+
+# Q14 model
+# =========
+# this (half) model is based on fieldmap
+# '2017-02-24_Q14_Model04_Sim_X=-14_14mm_Z=-500_500mm_Imc=146.6A_Itc=10A.txt'
+_q14_table = _utils.get_segmodel_table(
+    monomials=[1, 5, 9, 13],
+    segmodel=[
+        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
+        #                            PolyB(n=13)
+        ['Q14', 0.0700, +0.00000, -4.06e+00, +6.38e+04, -1.45e+13,
+         +2.90e+20],
+    ])
+
+# Q20 model
+# =========
+# this (half) model is based on fieldmap
+# '2017-02-24_Q20_Model05_Sim_X=-14_14mm_Z=-500_500mm_Imc=
+#  154.66A_Itc=10A.txt'
+_q20_table = _utils.get_segmodel_table(
+    monomials=[1, 5, 9, 13],
+    segmodel=[
+        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
+        #                                                      PolyB(n=13)
+        ['Q20', 0.1000, +0.00000, -4.74e+00, +8.41e+04, -1.83e+13,
+         +3.47e+20],
+    ])
+
+# Q30 model
+# =========
+# this (half) model is based on fieldmap
+# '2017-02-24_Q30_Model06_Sim_X=-14_14mm_Z=-500_500mm_Imc=
+#  153.8A_Itc=10A.txt'
+_q30_table = _utils.get_segmodel_table(
+    monomials=[1, 5, 9, 13],
+    segmodel=[
+        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
+        #                                                      PolyB(n=13)
+        ['Q30', 0.1500, +0.00000, -4.75e+00, +1.06e+05, -1.95e+13,
+         +3.56e+20],
+    ])
+
+# quadrupole models by model type, also used by the transport lines
+quadrupole_tables = {'q14': _q14_table, 'q20': _q20_table, 'q30': _q30_table}
+
+
+def get_segmodel_names():
+    """Return names of the available dipole segmented models."""
+    names = list(_segmodels)
+    if _os.path.isdir(segmodels_dir):
+        names += sorted(
+            fname[:-4] for fname in _os.listdir(segmodels_dir)
+            if fname.endswith('.npy'))
+    return names
+
+
+def get_segmodel(name):
+    """Return read-only table of a dipole segmented model.
+
+    name is either one of the average models 'BC', 'B1' and 'B2', the name
+    of a table file in segmodels_dir or the path of a .npy table file (see
+    utils.save_segmodel_table). Tables in files are memory-mapped.
+    """
+    if name in _segmodels:
+        return _segmodels[name]
+    fname = name if name.endswith('.npy') else \
+        _os.path.join(segmodels_dir, name + '.npy')
+    if not _os.path.isfile(fname):
+        raise ValueError('Segmented model not found: {}'.format(name))
+    return _utils.load_segmodel_table(fname)
+
+
+def get_fidelity(simplified=False, fidelity=None):
+    """Return fidelity level of the segmented models.
+
+    If fidelity is None the level is 'fast' for simplified models and 'full'
+    otherwise.
+    """
+    if fidelity is None:
+        return 'fast' if simplified else 'full'
+    if fidelity not in fidelity_levels:
+        raise ValueError(
+            'Invalid fidelity level: {}. Valid levels are {}'.format(
+                fidelity, fidelity_levels))
+    return fidelity
+
+
+def dipole_bc(m_accep_fam_name, simplified=False, fidelity=None,
+              segmodel='BC'):
+    """Segmented BC dipole model.
+
+    segmodel is the name of the model table (see get_segmodel).
+    """
+    segtypes = {
+        'BC': ('BC', _pyaccel.elements.rbend),
+        'BC_EDGE': ('BC_EDGE', _pyaccel.elements.marker),
+        'mc': ('mc', _pyaccel.elements.marker),
+        'm_accep': (m_accep_fam_name, _pyaccel.elements.marker),
+    }
+    segmodel = get_segmodel(segmodel)
+
+    fidelity = get_fidelity(simplified, fidelity)
+    if fidelity == 'fast':
+        return _get_simplified_bc_model(segmodel, m_accep_fam_name)
 
     # --- creates half model ---
-    d2r = _math.pi/180.0
-    PolyB = _np.zeros(1+max(monomials))
-    for i in range(len(segmodel)):
-        fam_name, element_type = segtypes[segmodel[i][0]]
-        if element_type == _pyaccel.elements.rbend:
-            for j in range(len(monomials)):
-                PolyB[monomials[j]] = segmodel[i][j+3]
-            PolyA = 0 * PolyB
-            element = element_type(
-                fam_name=fam_name, length=segmodel[i][1],
-                angle=d2r * segmodel[i][2],
-                angle_in=0, angle_out=0,
-                gap=0, fint_in=0, fint_out=0,
-                polynom_a=PolyA, polynom_b=PolyB)
-        else:
-            element = element_type(fam_name)
-        model.append(element)
+    model = _get_dipole_half_model(segmodel, segtypes, fidelity)
 
     # --- adds additional markers ---
-    mb2 = segtypes['mb2'][1](segtypes['mb2'][0])
+    mc = segtypes['mc'][1](segtypes['mc'][0])
     maccep = segtypes['m_accep'][1](segtypes['m_accep'][0])
-    model = model[::-1] + [mb2, maccep] + model
-
-    if simplified:
-        le = sum([s[1] for s in segmodel[:15]])
-        ang = sum([s[2] for s in segmodel]) * d2r
-        k = sum([s[4]*s[1] for s in segmodel])/le
-        s = sum([s[5]*s[1] for s in segmodel])/le
-        el = _pyaccel.elements.rbend(
-                fam_name='B2', length=2*le, angle=2*ang,
-                angle_in=0*ang, angle_out=0*ang,
-                gap=0, fint_in=0, fint_out=0,
-                polynom_a=[0, 0, 0], polynom_b=[0, k, s])
-        l2 = sum([s[1] for s in segmodel[15:]])
-        dr = _pyaccel.elements.drift('LB2', l2)
-        model = [dr, el, dr]
+    model = model[::-1] + [mc, maccep] + model
 
     return model
 
 
-def quadrupole_q14(fam_name, strength, simplified=False):
-    """Segmented Q14 quadrupole model."""
+def dipole_b1(m_accep_fam_name, simplified=False, fidelity=None,
+              segmodel='B1'):
+    """Segmented B1 dipole model.
+
+    segmodel is the name of the model table (see get_segmodel).
+    """
     segtypes = {
-        fam_name: (fam_name, _pyaccel.elements.quadrupole),
+        'B1': ('B1', _pyaccel.elements.rbend),
+        'B1_EDGE': ('B1_EDGE', _pyaccel.elements.marker),
+        'mb1': ('mb1', _pyaccel.elements.marker),
+        'm_accep': (m_accep_fam_name, _pyaccel.elements.marker),
     }
+    segmodel = get_segmodel(segmodel)
 
-    # Q14 model
-    # =========
-    # this (half) model is based on fieldmap
-    # '2017-02-24_Q14_Model04_Sim_X=-14_14mm_Z=-500_500mm_Imc=146.6A_Itc=10A.txt'
-    monomials = [1, 5, 9, 13]
-    segmodel = [
-        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
-        #                            PolyB(n=13)
-        [fam_name, 0.0700, +0.00000, -4.06e+00, +6.38e+04, -1.45e+13,
-         +2.90e+20],
-    ]
+    fidelity = get_fidelity(simplified, fidelity)
+    if fidelity == 'fast':
+        return _get_simplified_dipole_model(segmodel, 'B1', 'LB1')
 
-    # rescale fieldmap data to strength argument
-    quadidx = monomials.index(1)
-    seg_lens = [segmodel[i][1] for i in range(len(segmodel))]
-    model_length = 2 * sum(seg_lens)
-    fmap_strength = [2*segmodel[i][3+quadidx]*seg_lens[i]/model_length for i in
-                     range(len(segmodel))]
-    rescale = [strength / fmap_strength[i] for i in range(len(segmodel))]
+    # --- creates half model ---
+    model = _get_dipole_half_model(segmodel, segtypes, fidelity)
 
-    # --- hard-edge 1-segment model ---
-    model = []
-    i = 0
-    fam_name, element_type = segtypes[segmodel[i][0]]
-    PolyB = _np.zeros(1+max(monomials))
-    for j in range(len(monomials)):
-        PolyB[monomials[j]] = segmodel[i][j+3] * rescale[i]
-    PolyA = 0 * PolyB
-    element = element_type(fam_name=fam_name,
-                           length=2*segmodel[i][1], K=PolyB[1])
-    element.polynom_a = PolyA
-    element.polynom_b = PolyB
-    model.append(element)
-
-    if simplified:
-        model[0].polynom_a = model[0].polynom_a[:3]
-        model[0].polynom_b = model[0].polynom_b[:3]
+    # --- adds additional markers ---
+    mb1 = segtypes['mb1'][1](segtypes['mb1'][0])
+    maccep = segtypes['m_accep'][1](segtypes['m_accep'][0])
+    model = model[::-1] + [mb1, maccep] + model
 
     return model
 
 
-def quadrupole_q20(fam_name, strength, simplified=False):
-    """Segmented Q20 quadrupole model."""
+def dipole_b2(m_accep_fam_name, simplified=False, fidelity=None,
+              segmodel='B2'):
+    """Segmented B2 dipole model.
+
+    segmodel is the name of the model table (see get_segmodel).
+    """
     segtypes = {
-        fam_name: (fam_name, _pyaccel.elements.quadrupole),
+        'B2': ('B2', _pyaccel.elements.rbend),
+        'B2_EDGE': ('B2_EDGE', _pyaccel.elements.marker),
+        'mb2': ('mb2', _pyaccel.elements.marker),
+        'm_accep': (m_accep_fam_name, _pyaccel.elements.marker),
     }
+    segmodel = get_segmodel(segmodel)
 
-    # Q20 model
-    # =========
-    # this (half) model is based on fieldmap
-    # '2017-02-24_Q20_Model05_Sim_X=-14_14mm_Z=-500_500mm_Imc=
-    #  154.66A_Itc=10A.txt'
-    monomials = [1, 5, 9, 13]
-    segmodel = [
-        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
-        #                                                      PolyB(n=13)
-        [fam_name, 0.1000, +0.00000, -4.74e+00, +8.41e+04, -1.83e+13,
-         +3.47e+20],
-    ]
+    fidelity = get_fidelity(simplified, fidelity)
+    if fidelity == 'fast':
+        return _get_simplified_dipole_model(segmodel, 'B2', 'LB2')
 
-    # rescale fieldmap data to strength argument
-    quadidx = monomials.index(1)
-    seg_lens = [segmodel[i][1] for i in range(len(segmodel))]
-    model_length = 2 * sum(seg_lens)
-    fmap_strength = [2*segmodel[i][3+quadidx]*seg_lens[i]/model_length for i in
-                     range(len(segmodel))]
-    rescale = [strength / fmap_strength[i] for i in range(len(segmodel))]
+    # --- creates half model ---
+    model = _get_dipole_half_model(segmodel, segtypes, fidelity)
 
-    # --- hard-edge 1-segment model ---
-    model = []
-    i = 0
-    fam_name, element_type = segtypes[segmodel[i][0]]
-    PolyB = _np.zeros(1+max(monomials))
-    for j in range(len(monomials)):
-        PolyB[monomials[j]] = segmodel[i][j+3] * rescale[i]
-    PolyA = 0 * PolyB
-    element = element_type(fam_name=fam_name,
-                           length=2*segmodel[i][1], K=PolyB[1])
-    element.polynom_a = PolyA
-    element.polynom_b = PolyB
-    model.append(element)
-
-    if simplified:
-        model[0].polynom_a = model[0].polynom_a[:3]
-        model[0].polynom_b = model[0].polynom_b[:3]
+    # --- adds additional markers ---
+    mb2 = segtypes['mb2'][1](segtypes['mb2'][0])
+    maccep = segtypes['m_accep'][1](segtypes['m_accep'][0])
+    model = model[::-1] + [mb2, maccep] + model
 
     return model
 
 
-def quadrupole_q30(fam_name, strength, simplified=False):
+def quadrupoles(model_type, fam_names, strengths, errors=None,
+                simplified=False, fidelity=None):
+    """Segmented quadrupole models of a magnet model type.
+
+    Keyword arguments:
+    model_type -- 'q14', 'q20' or 'q30'
+    fam_names -- family names of the magnets
+    strengths -- strengths K [1/m^2] of the magnets
+    errors -- optional relative strength errors of the magnets
+
+    Returns list with the model of each magnet.
+    """
+    quads = _utils.create_quadrupoles(
+        quadrupole_tables[model_type], fam_names, strengths, errors)
+    fidelity = get_fidelity(simplified, fidelity)
+    for quad in quads:
+        if fidelity == 'fast':
+            quad.polynom_a = quad.polynom_a[:3]
+            quad.polynom_b = quad.polynom_b[:3]
+        elif fidelity == 'medium':
+            _prune_quadrupole_multipoles(quad)
+    return [[quad] for quad in quads]
+
+
+def quadrupole_q14(fam_name, strength, simplified=False, fidelity=None):
+    """Segmented Q14 quadrupole model."""
+    return quadrupoles(
+        'q14', [fam_name], [strength], simplified=simplified,
+        fidelity=fidelity)[0]
+
+
+def quadrupole_q20(fam_name, strength, simplified=False, fidelity=None):
+    """Segmented Q20 quadrupole model."""
+    return quadrupoles(
+        'q20', [fam_name], [strength], simplified=simplified,
+        fidelity=fidelity)[0]
+
+
+def quadrupole_q30(fam_name, strength, simplified=False, fidelity=None):
     """Segmented Q30 quadrupole model."""
-    segtypes = {
-        fam_name: (fam_name, _pyaccel.elements.quadrupole),
-    }
+    return quadrupoles(
+        'q30', [fam_name], [strength], simplified=simplified,
+        fidelity=fidelity)[0]
 
-    # Q30 model
-    # =========
-    # this (half) model is based on fieldmap
-    # '2017-02-24_Q30_Model06_Sim_X=-14_14mm_Z=-500_500mm_Imc=
-    #  153.8A_Itc=10A.txt'
-    monomials = [1, 5, 9, 13]
-    segmodel = [
-        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
-        #                                                      PolyB(n=13)
-        [fam_name, 0.1500, +0.00000, -4.75e+00, +1.06e+05, -1.95e+13,
-         +3.56e+20],
-    ]
 
-    # rescale fieldmap data to strength argument
-    quadidx = monomials.index(1)
-    seg_lens = [segmodel[i][1] for i in range(len(segmodel))]
-    model_length = 2 * sum(seg_lens)
-    fmap_strength = [2*segmodel[i][3+quadidx]*seg_lens[i]/model_length for i in
-                     range(len(segmodel))]
-    rescale = [strength / fmap_strength[i] for i in range(len(segmodel))]
+def _get_dipole_half_model(segmodel, segtypes, fidelity='full'):
+    if fidelity == 'medium':
+        curvature = _get_nominal_curvature(segmodel)
+        segmodel = _merge_dipole_segments(
+            segmodel, curvature, medium_fidelity_r0,
+            medium_fidelity_tolerance)
 
-    # --- hard-edge 1-segment model ---
-    model = []
-    i = 0
-    fam_name, element_type = segtypes[segmodel[i][0]]
-    PolyB = _np.zeros(1+max(monomials))
-    for j in range(len(monomials)):
-        PolyB[monomials[j]] = segmodel[i][j+3] * rescale[i]
-    PolyA = 0 * PolyB
-    element = element_type(fam_name=fam_name,
-                           length=2*segmodel[i][1], K=PolyB[1])
-    element.polynom_a = PolyA
-    element.polynom_b = PolyB
-    model.append(element)
-
-    if simplified:
-        model[0].polynom_a = model[0].polynom_a[:3]
-        model[0].polynom_b = model[0].polynom_b[:3]
+    # turns deflection angle error off (convenient for having a nominal model
+    # with zero 4d closed orbit)
+    polyb = segmodel['polynom_b'].copy()
+    polyb[:, 0] = 0.0
+    polya = _np.zeros(polyb.shape[1])
 
+    model = []
+    for i, seg in enumerate(segmodel['type']):
+        fam_name, element_type = segtypes[seg]
+        if element_type == _pyaccel.elements.rbend:
+            polynom_b = polyb[i]
+            if fidelity == 'medium':
+                polynom_b = _utils.prune_polynom(
+                    polynom_b, medium_fidelity_r0, medium_fidelity_threshold,
+                    reference=curvature,
+                    min_terms=medium_fidelity_min_terms)
+            element = element_type(
+                fam_name=fam_name, length=segmodel['length'][i],
+                angle=segmodel['angle'][i],
+                angle_in=0, angle_out=0,
+                gap=0, fint_in=0, fint_out=0,
+                polynom_a=polya[:len(polynom_b)], polynom_b=polynom_b)
+        else:
+            element = element_type(fam_name)
+        model.append(element)
     return model
+
+
+def _get_simplified_dipole_model(segmodel, fam_name, drift_name):
+    # segments up to the hard edge make the body of the simplified model
+    nr_segs = list(segmodel['type']).index(fam_name + '_EDGE') + 1
+    lens, polyb = segmodel['length'], segmodel['polynom_b']
+    le = _np.sum(lens[:nr_segs])
+    ang = _np.sum(segmodel['angle'])
+    k = _np.sum(polyb[:, 1]*lens)/le
+    s = _np.sum(polyb[:, 2]*lens)/le
+    el = _pyaccel.elements.rbend(
+        fam_name=fam_name, length=2*le, angle=2*ang,
+        angle_in=0*ang, angle_out=0*ang,
+        gap=0, fint_in=0, fint_out=0,
+        polynom_a=[0, 0, 0], polynom_b=[0, k, s])
+    l2 = _np.sum(lens[nr_segs:])
+    dr = _pyaccel.elements.drift(drift_name, l2)
+    return [dr, el, dr]
+
+
+def _get_simplified_bc_model(segmodel, m_accep_fam_name):
+    # the fast BC model keeps the momentum acceptance markers between three
+    # rbends. Its row slices are those of the original simplified model and
+    # hold only for tables with the segment layout of the average BC model.
+    if list(segmodel['type']) != list(_bc_table['type']):
+        raise ValueError(
+            'Fast BC model requires the segment layout of the BC table.')
+    lens, angs = segmodel['length'], segmodel['angle']
+    polyb = segmodel['polynom_b']
+    m_accep = _pyaccel.elements.marker(m_accep_fam_name)
+    le = _np.sum(lens[:8])
+    ang1 = _np.sum(angs[:8])
+    k = _np.sum(polyb[:8, 1]*lens[:8])/le
+    s = _np.sum(polyb[:8, 2]*lens[:8])/le
+    el = _pyaccel.elements.rbend(fam_name='BC', length=2*le, angle=2*ang1,
+                                 angle_in=0, angle_out=0,
+                                 gap=0, fint_in=0, fint_out=0,
+                                 polynom_a=[0, 0, 0], polynom_b=[0, k, s])
+    le = _np.sum(lens[9:14])
+    ang2 = _np.sum(angs[9:])
+    k = _np.sum(polyb[9:, 1]*lens[9:])/le
+    s = _np.sum(polyb[9:, 2]*lens[9:])/le
+    el_e = _pyaccel.elements.rbend(
+        fam_name='BC', length=le, angle=ang2,
+        angle_in=0, angle_out=0*ang2,
+        gap=0, fint_in=0, fint_out=0,
+        polynom_a=[0, 0, 0], polynom_b=[0, k, s])
+    el_b = _pyaccel.elements.rbend(
+        fam_name='BC', length=le, angle=ang2,
+        angle_in=0*ang2, angle_out=0,
+        gap=0, fint_in=0, fint_out=0,
+        polynom_a=[0, 0, 0], polynom_b=[0, k, s])
+    l2 = _np.sum(lens[14:])
+    dr = _pyaccel.elements.drift('LBC', l2)
+    return [dr, el_b, m_accep, el, m_accep, el_e, dr]
+
+
+def _get_nominal_curvature(segmodel):
+    sel = segmodel['length'] > 0
+    return abs(_np.sum(segmodel['angle'])) / _np.sum(segmodel['length'][sel])
+
+
+def _merge_dipole_segments(segmodel, curvature, r0, tolerance):
+    """Merge adjacent segments with similar field profiles.
+
+    Field profiles are compared through the vectors of curvature and
+    multipoles at r0, [angle/length, b_n*r0**n (n >= 1)], with tolerance
+    relative to the nominal curvature. Markers are kept and break merging.
+    Merged segments preserve total length, angle and integrated multipoles.
+    """
+    lens, angs = segmodel['length'], segmodel['angle']
+    polyb = segmodel['polynom_b']
+    rpow = r0**_np.arange(polyb.shape[1])
+    profiles = polyb * rpow
+    sel = lens > 0
+    profiles[sel, 0] = angs[sel] / lens[sel]
+
+    groups = []
+    for i, length in enumerate(lens):
+        start = groups[-1][0] if groups else None
+        if length > 0 and start is not None and lens[start] > 0 and \
+                segmodel['type'][i] == segmodel['type'][start] and \
+                _np.all(_np.abs(profiles[i] - profiles[start]) <=
+                        tolerance*curvature):
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+
+    merged = _np.zeros(len(groups), dtype=segmodel.dtype)
+    for i, group in enumerate(groups):
+        merged['type'][i] = segmodel['type'][group[0]]
+        length = _np.sum(lens[group])
+        merged['length'][i] = length
+        merged['angle'][i] = _np.sum(angs[group])
+        if length > 0:
+            merged['polynom_b'][i] = _np.dot(lens[group], polyb[group])/length
+    return merged
+
+
+def _prune_quadrupole_multipoles(element):
+    polynom_b = _utils.prune_polynom(
+        element.polynom_b, medium_fidelity_r0, medium_fidelity_threshold,
+        reference=abs(element.polynom_b[1])*medium_fidelity_r0,
+        min_terms=medium_fidelity_min_terms)
+    element.polynom_b = polynom_b
+    element.polynom_a = 0 * polynom_b
@@ -1,7 +1,11 @@
 """Element family definitions."""
 
+import numpy as _np
 import pyaccel as _pyaccel
 
+from .. import utils as _utils
+from .. import cache as _cache
+
 _family_segmentation = {
     'B': 16, 'CH': 1, 'CV': 1, 'CHV': 1, 'QS': 1,
     'QF2L': 1, 'QD2L': 1, 'QF3L': 1,
@@ -91,7 +95,7 @@ def families_di():
 
 def get_section_name_mapping(lattice):
     """Return list with section name of each lattice element."""
-    section_map = len(lattice)*['']
+    nr_eles = len(lattice)
 
     # find indices important to define the change of the names of the sections
     b = _pyaccel.lattice.find_indices(lattice, 'fam_name', 'B')
@@ -102,25 +106,22 @@ def get_section_name_mapping(lattice):
 
     # conditions that define change in section name:
     relev_inds = [b[b_nrsegs-1], b[2*b_nrsegs-1], b[-1]]
-    relev_inds += [len(lattice)-1]
-    relev_inds.sort()
-    # fill the section_map variable
-    ref = 0
-    for j in range(len(lattice)):
-        section_map[j] += secs[ref]
-        if j >= relev_inds[ref]:
-            ref += 1
+    relev_inds += [nr_eles-1]
+    _, codes = _utils.get_subsection_codes(
+        nr_eles, [nr_eles-1], [relev_inds])
 
-    return section_map
+    return _np.array(secs, dtype=object)[codes].tolist()
 
 
+@_cache.memoize_by_structure('TB_V04_01')
 def get_family_data(lattice):
     """Get pyaccel lattice model index and segmentation for each family name.
 
     Keyword argument:
     lattice -- lattice model
 
-    Returns dict.
+    Returns dict. The result is memoized by the structure of the lattice;
+    each call returns a copy of it, which may be modified.
     """
     latt_dict = _pyaccel.lattice.find_dict(lattice, 'fam_name')
     section_map = get_section_name_mapping(lattice)
@@ -7,10 +7,20 @@ import math as _math
 from pyaccel import lattice as _pyacc_lat, elements as _pyacc_ele, \
     accelerator as _pyacc_acc, optics as _pyacc_opt
 from . import segmented_models as _segmented_models
+from .. import utils as _utils
 
 energy = 0.150e9  # [eV]
 default_optics_mode = 'M1'
 
+# integration steps: (selection, step length [m], minimum number of steps)
+integ_steps_rules = (
+    (('CHV', 'QS'), None, 5),
+    ('bend', 0.035, 10),
+    ('quadrupole', None, 10),
+    ('sextupole', None, 10),
+    ('other', None, 1),
+)
+
 
 class LatticeError(Exception):
     """LatticeError class."""
@@ -296,50 +306,21 @@ def get_optics_mode(optics_mode):
 
 def set_num_integ_steps(the_line):
     """Set number of integration steps in each lattice element."""
-    dl = 0.035
-    for i, _ in enumerate(the_line):
-        if the_line[i].angle:
-            length = the_line[i].length
-            the_line[i].nr_steps = max(10, int(_math.ceil(length/dl)))
-        elif the_line[i].polynom_b[1]:
-            the_line[i].nr_steps = 10
-        elif the_line[i].polynom_b[2]:
-            the_line[i].nr_steps = 10
-        else:
-            the_line[i].nr_steps = 1
-
-    ch_indices = _pyacc_lat.find_indices(the_line, 'fam_name', 'CHV')
-    cv_indices = _pyacc_lat.find_indices(the_line, 'fam_name', 'CHV')
-    qs_indices = _pyacc_lat.find_indices(the_line, 'fam_name', 'QS')
-    corr_indices = ch_indices + cv_indices + qs_indices
-    for idx in corr_indices:
-        the_line[idx].nr_steps = 5
+    _utils.set_num_integ_steps(the_line, integ_steps_rules)
 
 
 def set_vacuum_chamber(the_line):
     """Set vacuum chamber for all elements."""
     # -- default physical apertures --
-    for i, _ in enumerate(the_line):
-        the_line[i].hmin = -0.018
-        the_line[i].hmax = +0.018
-        the_line[i].vmin = -0.018
-        the_line[i].vmax = +0.018
-
-    # -- bo injection septum --
-    beg = _pyacc_lat.find_indices(the_line, 'fam_name', 'bInjS')[0]
-    end = _pyacc_lat.find_indices(the_line, 'fam_name', 'eInjS')[0]
-    for i in range(beg, end+1):
-        the_line[i].hmin = -0.0075
-        the_line[i].hmax = +0.0075
-        the_line[i].vmin = -0.0080
-        the_line[i].vmax = +0.0080
-
-    # -- dipoles --
-    bnd = _pyacc_lat.find_indices(the_line, 'fam_name', 'B')
-    for i in bnd:
-        the_line[i].hmin = -0.0117
-        the_line[i].hmax = +0.0117
-        the_line[i].vmin = -0.0117
-        the_line[i].vmax = +0.0117
+    vchamber = [-0.018, +0.018, -0.018, +0.018]
+
+    regions = [
+        # -- bo injection septum --
+        (('bInjS', 'eInjS'), [-0.0075, +0.0075, -0.0080, +0.0080]),
+        # -- dipoles --
+        (_pyacc_lat.find_indices(the_line, 'fam_name', 'B'),
+         [-0.0117, +0.0117, -0.0117, +0.0117]),
+    ]
+    _utils.set_vacuum_chamber(the_line, vchamber, regions)
 
     return the_line
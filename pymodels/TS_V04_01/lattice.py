@@ -3,12 +3,12 @@
 In this module the lattice of the corresponding accelerator is defined.
 """
 
-import math as _math
 
 from pyaccel import lattice as _pyacc_lat, elements as _pyacc_ele, \
     accelerator as _pyacc_acc, optics as _pyacc_opt
 
 from . import segmented_models as _segmented_models
+from .. import utils as _utils
 
 
 class LatticeError(Exception):
@@ -18,10 +18,23 @@ class LatticeError(Exception):
 energy = 3e9  # [eV]
 default_optics_mode = 'M1'
 
+# integration steps: (selection, step length [m], minimum number of steps)
+integ_steps_rules = (
+    ('bend', 0.035, 10),
+    ('quadrupole', None, 10),
+    ('sextupole', None, 5),
+    ('other', None, 1),
+)
 
-def create_lattice(optics_mode=default_optics_mode):
-    """Create lattice function."""
+
+def create_lattice(optics_mode=default_optics_mode, quadrupole_errors=None):
+    """Create lattice function.
+
+    quadrupole_errors optionally maps quadrupole family names to relative
+    strength errors.
+    """
     strengths, twiss_at_start = get_optics_mode(optics_mode)
+    quadrupole_errors = dict(quadrupole_errors or dict())
 
     # -- shortcut symbols --
     marker = _pyacc_ele.marker
@@ -79,14 +92,11 @@ def create_lattice(optics_mode=default_optics_mode):
     cv = sextupole('CV', lcv, 0.0)  # same model as BO correctors
 
     # --- quadrupoles ---
-    qf1a = _segmented_models.quadrupole_q14('QF1A', strengths['qf1a'])
-    qf1b = _segmented_models.quadrupole_q14('QF1B', strengths['qf1b'])
-    qd2 = _segmented_models.quadrupole_q14('QD2', strengths['qd2'])
-    qf2 = _segmented_models.quadrupole_q20('QF2', strengths['qf2'])
-    qf3 = _segmented_models.quadrupole_q20('QF3', strengths['qf3'])
-    qd4a = _segmented_models.quadrupole_q14('QD4A', strengths['qd4a'])
-    qf4 = _segmented_models.quadrupole_q20('QF4', strengths['qf4'])
-    qd4b = _segmented_models.quadrupole_q14('QD4B', strengths['qd4b'])
+    qf1a, qf1b, qd2, qd4a, qd4b = _create_quadrupoles(
+        'q14', ('QF1A', 'QF1B', 'QD2', 'QD4A', 'QD4B'), strengths,
+        quadrupole_errors)
+    qf2, qf3, qf4 = _create_quadrupoles(
+        'q20', ('QF2', 'QF3', 'QF4'), strengths, quadrupole_errors)
 
     # --- bending magnets ---
     # -- b --
@@ -143,6 +153,12 @@ def create_lattice(optics_mode=default_optics_mode):
     return the_line, twiss_at_start
 
 
+def _create_quadrupoles(model_type, fam_names, strengths, errors):
+    return _segmented_models.quadrupoles(
+        model_type, fam_names, [strengths[fam.lower()] for fam in fam_names],
+        errors=[errors.get(fam, 0.0) for fam in fam_names])
+
+
 def get_optics_mode(optics_mode):
     """Return magnet strengths of a given opics mode."""
     twiss_at_start = _pyacc_opt.Twiss.make_new(
@@ -242,52 +258,22 @@ def get_optics_mode(optics_mode):
 
 def set_num_integ_steps(the_line):
     """Set number of integration steps in each lattice element."""
-    for i, _ in enumerate(the_line):
-        if the_line[i].angle:
-            length = the_line[i].length
-            the_line[i].nr_steps = max(10, int(_math.ceil(length/0.035)))
-        elif the_line[i].polynom_b[1]:
-            the_line[i].nr_steps = 10
-        elif the_line[i].polynom_b[2]:
-            the_line[i].nr_steps = 5
-        else:
-            the_line[i].nr_steps = 1
+    _utils.set_num_integ_steps(the_line, integ_steps_rules)
 
 
 def set_vacuum_chamber(the_line):
     """Set vacuum chamber for all elements."""
     # -- default physical apertures --
-    for ele in the_line:
-        ele.hmin = -0.012
-        ele.hmax = +0.012
-        ele.vmin = -0.012
-        ele.vmax = +0.012
-
-    # -- bo ejection septa --
-    beg = _pyacc_lat.find_indices(the_line, 'fam_name', 'bEjeSeptF')[0]
-    end = _pyacc_lat.find_indices(the_line, 'fam_name', 'eEjeSeptG')[0]
-    for i in range(beg, end+1):
-        the_line[i].hmin = -0.0150
-        the_line[i].hmax = +0.0150
-        the_line[i].vmin = -0.0040
-        the_line[i].vmax = +0.0040
-
-    # -- si thick injection septum --
-    beg = _pyacc_lat.find_indices(the_line, 'fam_name', 'bInjSeptG')[0]
-    end = _pyacc_lat.find_indices(the_line, 'fam_name', 'eInjSeptG')[0]
-    for i in range(beg, end+1):
-        the_line[i].hmin = -0.0045
-        the_line[i].hmax = +0.0045
-        the_line[i].vmin = -0.0035
-        the_line[i].vmax = +0.0035
-
-    # -- si thin injection septum --
-    beg = _pyacc_lat.find_indices(the_line, 'fam_name', 'bInjSeptF')[0]
-    end = _pyacc_lat.find_indices(the_line, 'fam_name', 'eInjSeptF')[0]
-    for i in range(beg, end+1):
-        the_line[i].hmin = -0.0150
-        the_line[i].hmax = +0.0150
-        the_line[i].vmin = -0.0035
-        the_line[i].vmax = +0.0035
+    vchamber = [-0.012, +0.012, -0.012, +0.012]
+
+    regions = [
+        # -- bo ejection septa --
+        (('bEjeSeptF', 'eEjeSeptG'), [-0.0150, +0.0150, -0.0040, +0.0040]),
+        # -- si thick injection septum --
+        (('bInjSeptG', 'eInjSeptG'), [-0.0045, +0.0045, -0.0035, +0.0035]),
+        # -- si thin injection septum --
+        (('bInjSeptF', 'eInjSeptF'), [-0.0150, +0.0150, -0.0035, +0.0035]),
+    ]
+    _utils.set_vacuum_chamber(the_line, vchamber, regions)
 
     return the_line
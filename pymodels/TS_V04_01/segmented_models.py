@@ -4,6 +4,9 @@ import math as _math
 import numpy as _np
 import pyaccel as _pyaccel
 
+from .. import utils as _utils
+from ..SI_V25_01 import segmented_models as _si_segmodels
+
 
 def dipole(sign, simplified=False):
     """Segmented TS dipole model."""
@@ -101,97 +104,43 @@ def dipole(sign, simplified=False):
     return model
 
 
-def quadrupole_q14(fam_name, strength, simplified=False):
-    """Segmented Q14 quadrupole model."""
-    segtypes = {
-        fam_name: (fam_name, _pyaccel.elements.quadrupole),
-    }
+# Quadrupole (half) models with a single hard-edge segment, the same of the
+# storage ring magnets. They are rescaled to the strength of each magnet by
+# quadrupoles.
+_quadrupole_tables = {
+    model_type: _si_segmodels.quadrupole_tables[model_type]
+    for model_type in ('q14', 'q20')}
 
-    # Q14 model
-    # =========
-    # this (half) model is based on fieldmap
-    # '2017-02-24_Q14_Model04_Sim_X=-14_14mm_Z=-500_500mm_Imc=146.6A_Itc=10A.txt'
-    monomials = [1, 5, 9, 13]
-    segmodel = [
-        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
-        #                            PolyB(n=13)
-        [fam_name, 0.0700, +0.00000, -4.06e+00, +6.38e+04, -1.45e+13,
-         +2.90e+20],
-    ]
 
-    # rescale fieldmap data to strength argument
-    quadidx = monomials.index(1)
-    seg_lens = [segmodel[i][1] for i in range(len(segmodel))]
-    model_length = 2 * sum(seg_lens)
-    fmap_strength = [2*segmodel[i][3+quadidx]*seg_lens[i]/model_length for i in
-                     range(len(segmodel))]
-    rescale = [strength / fmap_strength[i] for i in range(len(segmodel))]
+def quadrupoles(model_type, fam_names, strengths, errors=None,
+                simplified=False):
+    """Segmented quadrupole models of a magnet model type.
 
-    # --- hard-edge 1-segment model ---
-    model = []
-    i = 0
-    fam_name, element_type = segtypes[segmodel[i][0]]
-    PolyB = _np.zeros(1+max(monomials))
-    for j in range(len(monomials)):
-        PolyB[monomials[j]] = segmodel[i][j+3] * rescale[i]
-    PolyA = 0 * PolyB
-    element = element_type(fam_name=fam_name,
-                           length=2*segmodel[i][1], K=PolyB[1])
-    element.polynom_a = PolyA
-    element.polynom_b = PolyB
-    model.append(element)
+    Keyword arguments:
+    model_type -- 'q14' or 'q20'
+    fam_names -- family names of the magnets
+    strengths -- strengths K [1/m^2] of the magnets
+    errors -- optional relative strength errors of the magnets
 
+    Returns list with the model of each magnet.
+    """
+    quads = _utils.create_quadrupoles(
+        _quadrupole_tables[model_type], fam_names, strengths, errors)
     if simplified:
-        model[0].polynom_a = model[0].polynom_a[:3]
-        model[0].polynom_b = model[0].polynom_b[:3]
-    return model
-
-
-def quadrupole_q20(fam_name, strength, simplified=False):
-    """Segmented Q20 quadrupole model."""
-    segtypes = {
-        fam_name: (fam_name, _pyaccel.elements.quadrupole),
-    }
+        for quad in quads:
+            quad.polynom_a = quad.polynom_a[:3]
+            quad.polynom_b = quad.polynom_b[:3]
+    return [[quad] for quad in quads]
 
-    # Q20 model
-    # =========
-    # this (half) model is based on fieldmap
-    # '2017-02-24_Q20_Model05_Sim_X=-14_14mm_Z=-500_500mm_Imc=
-    #  154.66A_Itc=10A.txt'
-    monomials = [1, 5, 9, 13]
-    segmodel = [
-        # type  len[m]   angle[deg]  PolyB(n=1)   PolyB(n=5)   PolyB(n=9)
-        #                                                      PolyB(n=13)
-        [fam_name, 0.1000, +0.00000, -4.74e+00, +8.41e+04, -1.83e+13,
-         +3.47e+20],
-    ]
 
-    # rescale fieldmap data to strength argument
-    quadidx = monomials.index(1)
-    seg_lens = [segmodel[i][1] for i in range(len(segmodel))]
-    model_length = 2 * sum(seg_lens)
-    fmap_strength = [2*segmodel[i][3+quadidx]*seg_lens[i]/model_length for i in
-                     range(len(segmodel))]
-    rescale = [strength / fmap_strength[i] for i in range(len(segmodel))]
+def quadrupole_q14(fam_name, strength, simplified=False):
+    """Segmented Q14 quadrupole model."""
+    return quadrupoles('q14', [fam_name], [strength], simplified=simplified)[0]
 
-    # --- hard-edge 1-segment model ---
-    model = []
-    i = 0
-    fam_name, element_type = segtypes[segmodel[i][0]]
-    PolyB = _np.zeros(1+max(monomials))
-    for j in range(len(monomials)):
-        PolyB[monomials[j]] = segmodel[i][j+3] * rescale[i]
-    PolyA = 0 * PolyB
-    element = element_type(fam_name=fam_name,
-                           length=2*segmodel[i][1], K=PolyB[1])
-    element.polynom_a = PolyA
-    element.polynom_b = PolyB
-    model.append(element)
 
-    if simplified:
-        model[0].polynom_a = model[0].polynom_a[:3]
-        model[0].polynom_b = model[0].polynom_b[:3]
-    return model
+def quadrupole_q20(fam_name, strength, simplified=False):
+    """Segmented Q20 quadrupole model."""
+    return quadrupoles('q20', [fam_name], [strength], simplified=simplified)[0]
 
 
 def setpum(dip_nam, dip_len, dip_ang, strengths, nseg=6):
@@ -1,24 +1,38 @@
-"""PyModels package."""
+"""PyModels package.
+
+Lattice version subpackages are imported on first attribute access, so
+'import pymodels' does not load pyaccel models (nor the EPICS dependent
+middlelayer) that are not used.
+"""
 
 import os as _os
-from . import LI_V01_01
-from . import TB_V04_01
-from . import BO_V05_04
-from . import BO_V06_01
-from . import TS_V04_01
-from . import SI_V24_04
-from . import SI_V25_01
-from . import coordinate_system
-from . import middlelayer
+import importlib as _importlib
 
 with open(_os.path.join(__path__[0], 'VERSION'), 'r') as _f:
     __version__ = _f.read().strip()
 
-__all__ = ('LI_V01_01', 'TB_V04_01', 'BO_V05_04', 'BO_V06_01', 'TS_V04_01', 'SI_V24_04', 'SI_V25_01')
+from . import versions as _versions
+
+__all__ = _versions.get_versions()
+
+_submodules = __all__ + (
+    'coordinate_system', 'cache', 'middlelayer', 'utils', 'versions')
+
+# default lattice version of each accelerator
+_aliases = {
+    acc: _versions.get_default_version(acc)
+    for acc in ('li', 'tb', 'bo', 'ts', 'si')}
+
+
+def __getattr__(name):
+    modname = _aliases.get(name, name)
+    if modname not in _submodules:
+        raise AttributeError(
+            "module '{}' has no attribute '{}'".format(__name__, name))
+    module = _importlib.import_module('.' + modname, __name__)
+    globals()[name] = module
+    return module
 
 
-li = LI_V01_01
-tb = TB_V04_01
-bo = BO_V06_01
-ts = TS_V04_01
-si = SI_V25_01
+def __dir__():
+    return sorted(set(globals()) | set(_submodules) | set(_aliases))
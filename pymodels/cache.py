@@ -0,0 +1,176 @@
+"""Caches of built accelerator models and of data derived from them.
+
+Cached models are stored as pyaccel flat files in a per-version folder of
+the cache directory. The cache directory defaults to '~/.cache/pymodels' and
+can be changed with the PYMODELS_CACHE_DIR environment variable.
+
+Data derived from the lattice structure, such as family data, is memoized in
+memory with the 'memoize_by_structure' decorator.
+"""
+
+import os as _os
+import copy as _copy
+import shutil as _shutil
+import hashlib as _hashlib
+import tempfile as _tempfile
+import threading as _threading
+import functools as _functools
+import collections as _collections
+
+from pyaccel import lattice as _pyacc_lat
+
+
+with open(_os.path.join(_os.path.dirname(__file__), 'VERSION'), 'r') as _f:
+    _package_version = _f.read().strip()
+
+
+def get_cache_dir():
+    """Return folder where cached models are stored."""
+    folder = _os.environ.get('PYMODELS_CACHE_DIR')
+    if not folder:
+        folder = _os.path.join(_os.path.expanduser('~'), '.cache', 'pymodels')
+    return folder
+
+
+def get_cache_key(sources, *args):
+    """Return cache key for a model.
+
+    Keyword arguments:
+    sources -- list of source files the model is built from. Their contents
+        are hashed so that any change in the model tables invalidates the
+        cached files.
+    args -- model parameters (optics mode, fidelity flags, etc).
+
+    Returns str.
+    """
+    hsh = _hashlib.sha1(_package_version.encode())
+    for arg in args:
+        hsh.update(repr(arg).encode())
+    for fname in sorted(sources):
+        with open(fname, 'rb') as fil:
+            hsh.update(fil.read())
+    return hsh.hexdigest()
+
+
+def _get_filename(lattice_version, key):
+    return _os.path.join(get_cache_dir(), lattice_version, key + '.txt')
+
+
+def load_accelerator(lattice_version, key):
+    """Return cached accelerator or None if it is not in cache."""
+    fname = _get_filename(lattice_version, key)
+    if not _os.path.isfile(fname):
+        return None
+    try:
+        return _pyacc_lat.read_flat_file(fname)
+    except Exception:
+        # corrupted or incompatible file: it will be rebuilt.
+        return None
+
+
+def save_accelerator(accelerator, lattice_version, key):
+    """Save accelerator in cache."""
+    fname = _get_filename(lattice_version, key)
+    folder = _os.path.dirname(fname)
+    _os.makedirs(folder, exist_ok=True)
+    # writes to a temporary file first so that concurrent processes never
+    # read a partially written model.
+    fd, tmpname = _tempfile.mkstemp(dir=folder, suffix='.tmp')
+    _os.close(fd)
+    try:
+        _pyacc_lat.write_flat_file(accelerator, tmpname)
+        _os.replace(tmpname, fname)
+    finally:
+        if _os.path.exists(tmpname):
+            _os.remove(tmpname)
+
+
+def clear_cache(lattice_version=None):
+    """Remove cached models of a lattice version (all versions if None)."""
+    folder = get_cache_dir()
+    if lattice_version is not None:
+        folder = _os.path.join(folder, lattice_version)
+    if _os.path.isdir(folder):
+        _shutil.rmtree(folder)
+
+
+CacheInfo = _collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def get_structure_key(lattice):
+    """Return cheap key identifying the structure of a lattice.
+
+    The key is made of the number of elements and a blake2b digest of the
+    sequence of family names. It changes when elements are inserted, removed
+    or when the lattice is shifted, but not when element strengths change.
+    """
+    fam_names = [lattice[i].fam_name for i in range(len(lattice))]
+    digest = _hashlib.blake2b('\0'.join(fam_names).encode(), digest_size=16)
+    return len(fam_names), digest.digest()
+
+
+def _copy_containers(obj):
+    """Return copy of obj, copying its dicts and lists recursively.
+
+    Lists are assumed homogeneous, as in family data: a list whose first item
+    is not a dict or a list is copied shallowly, sharing its items (strings
+    and numbers). Other objects are deep copied.
+    """
+    if isinstance(obj, dict):
+        return {key: _copy_containers(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        if obj and isinstance(obj[0], (dict, list)):
+            return [_copy_containers(value) for value in obj]
+        return obj.copy()
+    return _copy.deepcopy(obj)
+
+
+def memoize_by_structure(lattice_version, maxsize=8):
+    """Memoize function of a lattice by the structure of the lattice.
+
+    Decorated functions must have the lattice as first argument and depend
+    only on its structure. Other arguments are assumed not to change the
+    result (e.g. precomputed indices) and are not part of the cache key.
+    Each call returns a copy of the dicts and lists of the memoized result,
+    so callers may modify it.
+
+    The decorated function has 'cache_info' and 'cache_clear' methods, as
+    the ones of functools.lru_cache.
+    """
+    def decorator(func):
+        cache = _collections.OrderedDict()
+        lock = _threading.Lock()
+        stats = [0, 0]  # hits, misses
+
+        @_functools.wraps(func)
+        def wrapper(lattice, *args, **kwargs):
+            key = (lattice_version, ) + get_structure_key(lattice)
+            with lock:
+                if key in cache:
+                    stats[0] += 1
+                    cache.move_to_end(key)
+                    return _copy_containers(cache[key])
+                stats[1] += 1
+            result = func(lattice, *args, **kwargs)
+            with lock:
+                cache[key] = result
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return _copy_containers(result)
+
+        def cache_info():
+            """Return hits, misses, maxsize and current size of cache."""
+            with lock:
+                return CacheInfo(stats[0], stats[1], maxsize, len(cache))
+
+        def cache_clear():
+            """Clear cache and statistics."""
+            with lock:
+                cache.clear()
+                stats[:] = [0, 0]
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
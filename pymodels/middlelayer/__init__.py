@@ -1 +1,3 @@
 from .main import get_element
+from .group import ElementGroup
+from .virtual import VirtualMachine
@@ -0,0 +1,218 @@
+"""Group access to the PVs of many middlelayer elements and families.
+
+Connections, gets and puts of all members of a group are issued
+concurrently by a shared pool of worker threads attached to the channel
+access context of the process, instead of one PV at a time.
+"""
+
+from collections import namedtuple as _namedtuple
+import time as _time
+import threading as _threading
+import concurrent.futures as _futures
+
+import numpy as np
+
+
+GroupResult = _namedtuple('GroupResult', ['values', 'failed'])
+
+default_timeout = 1.0  # [s]
+max_workers = 32
+
+_executor = None
+_executor_lock = _threading.Lock()
+
+
+def _use_ca_context():
+    # worker threads must share the channel access context of the process
+    try:
+        from epics import ca as _ca
+    except ImportError:
+        return
+    _ca.use_initial_context()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # creates the initial context before the workers attach to it, as
+            # concurrent initializations of libca crash
+            _use_ca_context()
+            _executor = _futures.ThreadPoolExecutor(
+                max_workers=max_workers, initializer=_use_ca_context)
+        return _executor
+
+
+class ElementGroup():
+    """Concurrent PV access of many elements and families.
+
+    Members are middlelayer Element or Family objects. Operations wait at
+    most timeout seconds for each member, counted from the start of its PV
+    call, and report failed members instead of raising, returning
+    GroupResult namedtuples with fields
+        values -- numpy array with one value per member, nan if failed
+        failed -- dict of error messages by name of the failed members
+    """
+
+    def __init__(self, elements, timeout=default_timeout):
+        self._elements = list(elements)
+        self._names = [str(ele._name) for ele in self._elements]
+        self.timeout = timeout
+
+    @property
+    def names(self):
+        return list(self._names)
+
+    def __len__(self):
+        return len(self._elements)
+
+    def wait_for_connection(self, timeout=None):
+        """Wait for connection of all PVs.
+
+        Returns dict of error messages by name of the members with PVs not
+        connected.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        results = self._run(
+            _wait_for_connection, [(ele, timeout) for ele in self._elements],
+            timeout)
+        failed = dict()
+        for name, (value, error) in zip(self._names, results):
+            if error is None and not value:
+                error = 'not connected'
+            if error is not None:
+                failed[name] = error
+        return failed
+
+    @property
+    def connected(self):
+        return all(ele.connected for ele in self._elements)
+
+    def get_current(self, timeout=None):
+        """Read current (or voltage) readbacks of all members.
+
+        Returns GroupResult namedtuple.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        results = self._run(
+            _get_value, [(ele._rb, timeout) for ele in self._elements],
+            timeout)
+        return self._get_result(results)
+
+    def set_current(self, values, wait=False, timeout=None):
+        """Write current (or voltage) setpoints of all members.
+
+        values is a scalar or a sequence with one value per member. If wait
+        is True, each put waits for completion. Returns GroupResult
+        namedtuple with the values written.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        values = np.broadcast_to(
+            np.asarray(values, dtype=float), (len(self._elements), ))
+        results = self._run(
+            _put_value,
+            [(ele._sp, value, wait, timeout)
+             for ele, value in zip(self._elements, values)], timeout)
+        return self._get_result(results)
+
+    def get_strength(self, timeout=None):
+        """Read strengths of all members, converted from current readbacks.
+
+        Returns GroupResult namedtuple.
+        """
+        currents, failed = self.get_current(timeout)
+        strengths = np.full(len(self._elements), np.nan)
+        for i, (ele, current) in enumerate(zip(self._elements, currents)):
+            if self._names[i] not in failed:
+                strengths[i] = ele._norm.conv_current_2_strength(
+                    current, strengths_dipole=ele._model.energy*1e-9)
+        return GroupResult(strengths, failed)
+
+    def set_strength(self, values, wait=False, timeout=None):
+        """Write strengths of all members, converted to current setpoints.
+
+        Returns GroupResult namedtuple with the currents written.
+        """
+        values = np.broadcast_to(
+            np.asarray(values, dtype=float), (len(self._elements), ))
+        currents = [
+            ele._norm.conv_strength_2_current(
+                value, strengths_dipole=ele._model.energy*1e-9)
+            for ele, value in zip(self._elements, values)]
+        return self.set_current(currents, wait=wait, timeout=timeout)
+
+    def _run(self, func, args, timeout):
+        """Run func concurrently; return list of (result, error) pairs.
+
+        Each call times out timeout seconds after it starts in a worker
+        thread, so time spent waiting for a free worker is not counted.
+        """
+        executor = _get_executor()
+        starts = [None] * len(args)
+
+        def call(i, arg):
+            starts[i] = _time.monotonic()
+            return func(*arg)
+
+        futures = [executor.submit(call, i, arg) for i, arg in enumerate(args)]
+        pending = dict(zip(futures, range(len(futures))))
+        timedout = set()
+        while pending:
+            now = _time.monotonic()
+            wait = timeout
+            for future, i in list(pending.items()):
+                if starts[i] is None:
+                    continue
+                remaining = starts[i] + timeout - now
+                if remaining <= 0 and not future.done():
+                    timedout.add(future)
+                    del pending[future]
+                else:
+                    wait = min(wait, remaining)
+            if not pending:
+                break
+            done, _ = _futures.wait(
+                pending, timeout=max(wait, 0),
+                return_when=_futures.FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+        results = []
+        for future in futures:
+            if future in timedout:
+                results.append((None, 'timeout'))
+            elif future.exception() is not None:
+                results.append((None, repr(future.exception())))
+            else:
+                results.append((future.result(), None))
+        return results
+
+    def _get_result(self, results):
+        values = np.full(len(self._elements), np.nan)
+        failed = dict()
+        for i, (value, error) in enumerate(results):
+            if error is None:
+                values[i] = value
+            else:
+                failed[self._names[i]] = error
+        return GroupResult(values, failed)
+
+
+def _wait_for_connection(ele, timeout):
+    return ele._sp.wait_for_connection(timeout=timeout) and \
+        ele._rb.wait_for_connection(timeout=timeout)
+
+
+def _get_value(pv, timeout):
+    if not pv.connected:
+        raise ConnectionError('{} not connected'.format(pv.pvname))
+    value = pv.get(timeout=timeout)
+    if value is None:
+        raise TimeoutError('{} get timed out'.format(pv.pvname))
+    return value
+
+
+def _put_value(pv, value, wait, timeout):
+    if not pv.connected:
+        raise ConnectionError('{} not connected'.format(pv.pvname))
+    pv.put(value, wait=wait, timeout=timeout)
+    return value
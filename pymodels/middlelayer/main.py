@@ -1,18 +1,227 @@
 
 from collections import OrderedDict
+import asyncio as _asyncio
+import threading as _threading
+import weakref as _weakref
 
 import numpy as np
 
 from siriuspy.epics import PV as _PV
 from siriuspy.magnet.factory import NormalizerFactory as _NormFact
 
+from . import group as _group
+
+
+# PV objects shared by all elements and families
+_pv_pool = dict()
+_pv_pool_lock = _threading.Lock()
+
+# callable creating the PV objects of the pool
+_pv_factory = _PV
+
+
+def get_pv(pvname):
+    """Return PV object of pvname, created once and shared."""
+    with _pv_pool_lock:
+        pv = _pv_pool.get(pvname)
+        if pv is None:
+            pv = _pv_factory(pvname)
+            _pv_pool[pvname] = pv
+        return pv
+
+
+def clear_pv_pool():
+    """Remove all PV objects from the shared pool."""
+    with _pv_pool_lock:
+        _pv_pool.clear()
+
+
+def set_pv_factory(factory=None):
+    """Set callable creating PV objects from PV names.
+
+    None restores EPICS PVs. The PV pool is cleared, so elements and families
+    created afterwards use PVs of the new factory.
+    """
+    global _pv_factory
+    with _pv_pool_lock:
+        _pv_factory = _PV if factory is None else factory
+        _pv_pool.clear()
+
+
+# callable creating the current to strength normalizers of elements and
+# families from their names; None uses siriuspy normalizers
+_normalizer_factory = None
+
+
+def set_normalizer_factory(factory=None):
+    """Set callable creating current to strength normalizers from names.
+
+    None restores siriuspy normalizers, which read excitation data from the
+    control system web server. Elements and families created afterwards use
+    normalizers of the new factory.
+    """
+    global _normalizer_factory
+    _normalizer_factory = factory
+
+
+def create_normalizer(name):
+    """Return current to strength normalizer of a magnet device."""
+    if _normalizer_factory is None:
+        return _NormFact.create(name)
+    return _normalizer_factory(name)
+
+
+class LinearNormalizer():
+    """Normalizer with strengths proportional to currents.
+
+    Stand-in for siriuspy normalizers when excitation data is not available;
+    with the default factor currents are in the units of the model strengths.
+    """
+
+    def __init__(self, name=None, factor=1.0):
+        self.name = name
+        self.factor = factor
+
+    def conv_current_2_strength(self, currents, strengths_dipole=None):
+        return np.multiply(currents, self.factor)
+
+    def conv_strength_2_current(self, strengths, strengths_dipole=None):
+        return np.divide(strengths, self.factor)
+
+
+def get_pvnames(name, magnet_type, family=False):
+    """Return setpoint and readback PV names of a magnet device."""
+    prop_sp = 'Current-SP'
+    prop_rb = 'Current-RB'
+    dis = 'PS'
+    if magnet_type == 'linac_quadrupole':
+        prop_sp = 'seti'
+        prop_rb = 'rdi'
+    elif magnet_type == 'pulsed_magnet':
+        dis = 'PM' if family else 'PU'
+        prop_sp = 'Voltage-SP'
+        prop_rb = 'Voltage-RB'
+    return (name.substitute(dis=dis, propty=prop_sp),
+            name.substitute(dis=dis, propty=prop_rb))
+
+
+# attributes of the model elements summed over the segments of a magnet
+_aggregate_attrs = (
+    'length', 'angle', 'KL', 'KsL', 'SL', 'hkick_polynom', 'vkick_polynom')
+
+
+# attributes of the segments of each model, shared by all middlelayer
+# objects on the same model and keyed by its id
+_segment_stores = dict()
+
+
+class _SegmentStore():
+    """Attributes of the segments of a model, cached by segment index."""
+
+    def __init__(self, nr_segs):
+        self.values = np.zeros((len(_aggregate_attrs), nr_segs))
+        self.valid = np.zeros(nr_segs, dtype=bool)
+
+
+def _get_segment_store(model):
+    # models that can not be weakly referenced (e.g. plain lists) are not
+    # cached, as their id may be reused by another model once collected:
+    # they get an empty store on each access, so attributes are read again
+    key = id(model)
+    store = _segment_stores.get(key)
+    if store is None or store.valid.size != len(model):
+        if store is None:
+            try:
+                _weakref.finalize(model, _segment_stores.pop, key, None)
+            except TypeError:
+                return _SegmentStore(len(model))
+        store = _SegmentStore(len(model))
+        _segment_stores[key] = store
+    return store
+
+
+def invalidate_model_cache(model):
+    """Read all model attributes again on next access of the middlelayer.
+
+    Must be called when the model is changed outside the middlelayer, as
+    with pyaccel; changes made by any middlelayer object on the model are
+    seen by all others.
+    """
+    store = _segment_stores.get(id(model))
+    if store is not None:
+        store.valid[:] = False
+
+
+class _ModelAggregates():
+    """Sums of model attributes over the segments of each magnet.
+
+    Segment attributes are cached in the store of the model and read again
+    only for segments invalidated by a write through any middlelayer
+    object on the model.
+    """
+
+    def __init__(self, model, indices):
+        self._model = model
+        nr_segs = [len(indcs) for indcs in indices]
+        self._seg_indcs = np.array(
+            [int(idx) for indcs in indices for idx in indcs], dtype=int)
+        self._seg_magnet = np.repeat(np.arange(len(indices)), nr_segs)
+        self._bounds = np.cumsum([0] + nr_segs)
+
+    def set_dirty(self, magnet=None):
+        store = _get_segment_store(self._model)
+        store.valid[self._get_segments(magnet)] = False
+
+    def get(self, attr, magnet=None):
+        segs = self._get_segments(magnet)
+        store = _get_segment_store(self._model)
+        for idx in segs[~store.valid[segs]]:
+            ele = self._model[int(idx)]
+            store.values[:, idx] = [
+                getattr(ele, name) for name in _aggregate_attrs]
+            store.valid[idx] = True
+        values = store.values[_aggregate_attrs.index(attr), segs]
+        if magnet is not None:
+            return values.sum()
+        return np.bincount(
+            self._seg_magnet, weights=values,
+            minlength=len(self._bounds) - 1)
+
+    def _get_segments(self, magnet):
+        if magnet is None:
+            return self._seg_indcs
+        return self._seg_indcs[self._bounds[magnet]:self._bounds[magnet+1]]
+
+
+def _get_scale_factors(values, strengths, name):
+    """Return factors scaling model strengths to values.
+
+    Raises ValueError for nonzero values of magnets with zero strength, whose
+    polynoms can not be scaled; unchanged zero strengths give factor one.
+    """
+    values = np.asarray(values, dtype=float)
+    strengths = np.asarray(strengths, dtype=float)
+    zero = strengths == 0
+    if np.any(zero & (values != 0)):
+        raise ValueError(
+            '{}: can not scale zero model strength'.format(name))
+    factors = np.divide(
+        values, strengths, out=np.ones(np.broadcast(values, strengths).shape),
+        where=~zero)
+    return factors if factors.ndim else float(factors)
+
 
 class ModelElement():
-    def __init__(self, name, model, index, magnet_type):
+    def __init__(self, name, model, index, magnet_type,
+                 aggregates=None, magnet=0):
         self._model = model
         self._indcs = index
         self._name = name
         self._type = magnet_type
+        if aggregates is None:
+            aggregates = _ModelAggregates(model, [index])
+        self._aggregates = aggregates
+        self._magnet = magnet
 
     @property
     def magnet_type(self):
@@ -28,31 +237,38 @@ class ModelElement():
 
     @property
     def model_length(self):
-        return sum([self._model[idx].length for idx in self._indcs])
+        return self._aggregates.get('length', self._magnet)
 
     @property
     def model_angle(self):
-        return sum([self._model[idx].angle for idx in self._indcs])
+        return self._aggregates.get('angle', self._magnet)
 
     @property
     def model_KL(self):
-        return sum([self._model[idx].KL for idx in self._indcs])
+        return self._aggregates.get('KL', self._magnet)
 
     @property
     def model_KsL(self):
-        return sum([self._model[idx].KsL for idx in self._indcs])
+        return self._aggregates.get('KsL', self._magnet)
 
     @property
     def model_hkick(self):
-        return sum([self._model[idx].hkick_polynom for idx in self._indcs])
+        return self._aggregates.get('hkick_polynom', self._magnet)
 
     @property
     def model_vkick(self):
-        return sum([self._model[idx].vkick_polynom for idx in self._indcs])
+        return self._aggregates.get('vkick_polynom', self._magnet)
 
     @property
     def model_SL(self):
-        return sum([self._model[idx].SL for idx in self._indcs])
+        return self._aggregates.get('SL', self._magnet)
+
+    def invalidate_model_cache(self):
+        """Read model attributes of the magnet again on next access.
+
+        Must be called when the model is changed outside the middlelayer.
+        """
+        self._aggregates.set_dirty(self._magnet)
 
     @property
     def model_strength(self):
@@ -76,38 +292,67 @@ class ModelElement():
             for idx in self._indcs:
                 self._model[idx].vkick_polynom = value * 1e-6
         elif self._type.endswith(('quadrupole', 'sextupole')):
-            inival = self.model_strength
-            alpha = value/inival * 1
+            alpha = _get_scale_factors(
+                value, self.model_strength, self._name)
             for idx in self._indcs:
                 self._model[idx].polynom_b *= alpha
                 self._model[idx].polynom_a *= alpha
         elif self._type.endswith('pulsed_magnet'):
-            inival = self.model_strength
-            alpha = value/inival * 1e-3
+            alpha = _get_scale_factors(
+                value, self.model_strength, self._name) * 1e-3
             for idx in self._indcs:
                 ang = self._model[idx].angle
                 self._model[idx].polynom_b *= alpha
                 self._model[idx].polynom_a *= alpha
                 self._model[idx].hkick_polynom += ang*(alpha-1)
+        self._aggregates.set_dirty(self._magnet)
+
+
+class _AsyncPVAccess():
+    """Coroutine counterparts of the blocking PV properties.
+
+    Blocking PV calls run in the worker threads of the middlelayer group
+    access, so the event loop is not blocked and many reads can be awaited
+    together with asyncio.gather. Awaiting coroutines may be cancelled.
+    timeout [s] bounds the PV call; None uses the PV default.
+    """
+
+    async def wait_for_connection(self, timeout=None):
+        """Wait for connection of setpoint and readback PVs."""
+        return await self._run_pv_call(
+            _group._wait_for_connection, self, timeout)
 
+    async def get_current(self, timeout=None):
+        return await self._run_pv_call(_group._get_value, self._rb, timeout)
 
-class Element(ModelElement):
+    async def set_current(self, value, wait=False, timeout=None):
+        await self._run_pv_call(
+            _group._put_value, self._sp, value, wait, timeout)
+
+    async def get_strength(self, timeout=None):
+        current = await self.get_current(timeout)
+        return self._norm.conv_current_2_strength(
+            current, strengths_dipole=self._model.energy*1e-9)
+
+    async def set_strength(self, value, wait=False, timeout=None):
+        current = self._norm.conv_strength_2_current(
+            value, strengths_dipole=self._model.energy*1e-9)
+        await self.set_current(current, wait=wait, timeout=timeout)
+
+    @staticmethod
+    async def _run_pv_call(func, *args):
+        loop = _asyncio.get_running_loop()
+        return await loop.run_in_executor(_group._get_executor(), func, *args)
+
+
+class Element(ModelElement, _AsyncPVAccess):
 
     def __init__(self, name, model, index, magnet_type):
         super().__init__(name, model, index, magnet_type)
-        self._norm = _NormFact.create(name)
-        prop_sp = 'Current-SP'
-        prop_rb = 'Current-RB'
-        dis = 'PS'
-        if self._type == 'linac_quadrupole':
-            prop_sp = 'seti'
-            prop_rb = 'rdi'
-        elif self._type == 'pulsed_magnet':
-            dis = 'PU'
-            prop_sp = 'Voltage-SP'
-            prop_rb = 'Voltage-RB'
-        self._sp = _PV(self._name.substitute(dis=dis, propty=prop_sp))
-        self._rb = _PV(self._name.substitute(dis=dis, propty=prop_rb))
+        self._norm = create_normalizer(name)
+        pvname_sp, pvname_rb = get_pvnames(self._name, self._type)
+        self._sp = get_pv(pvname_sp)
+        self._rb = get_pv(pvname_rb)
 
     @property
     def connected(self):
@@ -142,29 +387,27 @@ class Element(ModelElement):
             value, strengths_dipole=self._model.energy*1e-9)
 
 
-class Family():
+class Family(_AsyncPVAccess):
 
     def __init__(self, name, model, magnets, index, magnet_type):
         self._model = model
+        self._aggregates = _ModelAggregates(model, index)
         self._elements = OrderedDict()
-        for n, idx in zip(magnets, index):
-            self._elements[n] = ModelElement(n, model, idx, magnet_type)
+        for i, (n, idx) in enumerate(zip(magnets, index)):
+            self._elements[n] = ModelElement(
+                n, model, idx, magnet_type, self._aggregates, i)
         self._indcs = index
+        # flattened segment indices and the magnet each one belongs to
+        self._seg_indcs = [int(idx) for indcs in index for idx in indcs]
+        self._seg_magnet = np.repeat(
+            np.arange(len(index)), [len(indcs) for indcs in index])
         self._name = name
         self._type = magnet_type
-        self._norm = _NormFact.create(name)
-        prop_sp = 'Current-SP'
-        prop_rb = 'Current-RB'
-        dis = 'PS'
-        if self._type == 'linac_quadrupole':
-            prop_sp = 'seti'
-            prop_rb = 'rdi'
-        elif self._type == 'pulsed_magnet':
-            dis = 'PM'
-            prop_sp = 'Voltage-SP'
-            prop_rb = 'Voltage-RB'
-        self._sp = _PV(self._name.substitute(dis=dis, propty=prop_sp))
-        self._rb = _PV(self._name.substitute(dis=dis, propty=prop_rb))
+        self._norm = create_normalizer(name)
+        pvname_sp, pvname_rb = get_pvnames(
+            self._name, self._type, family=True)
+        self._sp = get_pv(pvname_sp)
+        self._rb = get_pv(pvname_rb)
 
     @property
     def model_nrsegs(self):
@@ -176,32 +419,39 @@ class Family():
 
     @property
     def model_length(self):
-        return self._get_from_model('model_length')
+        return self._get_from_model('length')
 
     @property
     def model_angle(self):
-        return self._get_from_model('model_angle')
+        return self._get_from_model('angle')
 
     @property
     def model_KL(self):
-        return self._get_from_model('model_KL')
+        return self._get_from_model('KL')
 
     @property
     def model_hkick(self):
-        return self._get_from_model('model_hkick')
+        return self._get_from_model('hkick_polynom')
 
     @property
     def model_vkick(self):
-        return self._get_from_model('model_vkick')
+        return self._get_from_model('vkick_polynom')
 
     @property
     def model_SL(self):
-        return self._get_from_model('model_SL')
+        return self._get_from_model('SL')
 
     def _get_from_model(self, attr):
-        vals = [getattr(ele, attr) for ele in self._elements.values()]
+        vals = self._aggregates.get(attr)
         return vals[np.argmin(np.abs(vals))]
 
+    def invalidate_model_cache(self):
+        """Read model attributes of the magnets again on next access.
+
+        Must be called when the model is changed outside the middlelayer.
+        """
+        self._aggregates.set_dirty()
+
     @property
     def model_strength(self):
         if self._type.endswith('quadrupole'):
@@ -217,10 +467,54 @@ class Family():
 
     @model_strength.setter
     def model_strength(self, value):
+        strengths = self._get_model_strengths()
         value -= self.model_strength
         value /= self.model_length
-        for ele in self._elements.values():
-            ele.model_strength += value*ele.model_length
+        self._set_model_strengths(
+            strengths + value*self._aggregates.get('length'), strengths)
+
+    def _get_model_strengths(self):
+        """Return model strength of each magnet."""
+        get = self._aggregates.get
+        if self._type.endswith('quadrupole'):
+            return get('KL') * 1
+        elif self._type.endswith('sextupole'):
+            return get('SL') * 1
+        elif self._type.endswith('horizontal_corrector'):
+            return get('hkick_polynom') * 1e6
+        elif self._type.endswith('vertical_corrector'):
+            return get('vkick_polynom') * 1e6
+        elif self._type.endswith('pulsed_magnet'):
+            return (get('hkick_polynom') + get('angle')) * 1e3
+
+    def _set_model_strengths(self, values, strengths):
+        """Set model strength of each magnet in a single pass over segments.
+
+        Same as setting model_strength of each element, given the current
+        strengths of the magnets.
+        """
+        values = values[self._seg_magnet]
+        if self._type.endswith('horizontal_corrector'):
+            for idx, value in zip(self._seg_indcs, values):
+                self._model[idx].hkick_polynom = value * 1e-6
+        elif self._type.endswith('vertical_corrector'):
+            for idx, value in zip(self._seg_indcs, values):
+                self._model[idx].vkick_polynom = value * 1e-6
+        elif self._type.endswith(('quadrupole', 'sextupole')):
+            alphas = _get_scale_factors(
+                values, strengths[self._seg_magnet], self._name)
+            for idx, alpha in zip(self._seg_indcs, alphas):
+                self._model[idx].polynom_b *= alpha
+                self._model[idx].polynom_a *= alpha
+        elif self._type.endswith('pulsed_magnet'):
+            alphas = _get_scale_factors(
+                values, strengths[self._seg_magnet], self._name) * 1e-3
+            for idx, alpha in zip(self._seg_indcs, alphas):
+                ang = self._model[idx].angle
+                self._model[idx].polynom_b *= alpha
+                self._model[idx].polynom_a *= alpha
+                self._model[idx].hkick_polynom += ang*(alpha-1)
+        self._aggregates.set_dirty()
 
     @property
     def connected(self):
@@ -0,0 +1,269 @@
+"""Virtual accelerator serving the middlelayer PVs from a pymodels model.
+
+A VirtualMachine serves the setpoint and readback PVs of the magnet devices
+of a lattice version, as given by its get_control_system_data, backed by an
+accelerator model: setpoints change the model and readbacks follow it, with
+configurable latency and noise. While it runs, middlelayer elements and
+families created in the process use its PVs instead of EPICS ones, and its
+normalizers, which do not need the control system network. It can also be
+run as a channel access soft IOC (requires pcaspy).
+"""
+
+import time as _time
+import threading as _threading
+
+import numpy as np
+
+from siriuspy.namesys import SiriusPVName as _PVName, join_name as _join_name
+from siriuspy.magnet.factory import NormalizerFactory as _NormFact
+
+from .. import versions as _versions
+from . import main as _main
+
+
+# magnet types whose strength is defined in the model (see ModelElement)
+_model_types = (
+    'quadrupole', 'sextupole', 'horizontal_corrector', 'vertical_corrector',
+    'pulsed_magnet')
+
+
+class VirtualPV():
+    """PV of a VirtualMachine, with the interface of the EPICS PVs."""
+
+    def __init__(self, pvname, machine):
+        self.pvname = pvname
+        self._machine = machine
+
+    @property
+    def connected(self):
+        return self._machine.running and self.pvname in self._machine.pvnames
+
+    def wait_for_connection(self, timeout=None):
+        return self.connected
+
+    def get(self, timeout=None):
+        return self._machine.get(self.pvname)
+
+    def put(self, value, wait=False, timeout=None):
+        self._machine.put(self.pvname, value)
+
+    @property
+    def value(self):
+        return self.get()
+
+    @value.setter
+    def value(self, value):
+        self.put(value)
+
+
+class VirtualMachine():
+    """Model-backed stand-in for the magnet PVs of an accelerator.
+
+    Keyword arguments:
+    version -- name of a registered lattice version with control system data
+    model -- accelerator model of the machine, created with the default
+        optics of the version if not given
+    latency -- delay [s] of each get and put
+    noise -- standard deviation of the readbacks, in the units of the PVs
+    seed -- seed of the noise generator
+    normalizer_factory -- callable returning the current to strength
+        normalizer of a device name. If None, siriuspy normalizers are used
+        while excitation data is available and main.LinearNormalizer ones
+        otherwise (e.g. offline).
+
+    Setpoints of devices whose strength is not defined in the model (dipoles)
+    are stored and echoed by their readbacks. Only one machine serves the
+    middlelayer of a process at a time.
+    """
+
+    def __init__(self, version, model=None, latency=0.0, noise=0.0,
+                 seed=None, normalizer_factory=None):
+        if model is None:
+            model = _versions.load_version(version).create_accelerator()
+            if isinstance(model, tuple):
+                # transport lines also return twiss at start
+                model = model[0]
+        self.version = version
+        self.model = model
+        self.latency = latency
+        self.noise = noise
+        self._rng = np.random.RandomState(seed)
+        if normalizer_factory is None:
+            normalizer_factory = self._create_normalizer
+        self._normalizer_factory = normalizer_factory
+        self._excdata_available = True
+        self._lock = _threading.RLock()
+        self._running = False
+        self._devices_data = get_devices_data(version, model)
+        # setpoint PV name of each setpoint and readback PV name
+        self._pvnames_sp = dict()
+        for name, data in self._devices_data.items():
+            pvname_sp, pvname_rb = _main.get_pvnames(
+                name, data['magnet_type'], family='magnets' in data)
+            data['pvname_sp'] = pvname_sp
+            self._pvnames_sp[pvname_sp] = pvname_sp
+            self._pvnames_sp[pvname_rb] = pvname_sp
+        self._devices = None
+        self._setpoints = None
+
+    @property
+    def pvnames(self):
+        """Names of the setpoint and readback PVs served."""
+        return self._pvnames_sp.keys()
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        """Serve the PVs to middlelayer elements and families created next."""
+        with self._lock:
+            _main.set_pv_factory(self._create_pv)
+            _main.set_normalizer_factory(self._normalizer_factory)
+            if self._devices is None:
+                self._create_devices()
+            self._running = True
+
+    def stop(self):
+        """Stop serving the PVs and restore EPICS PVs in the middlelayer."""
+        with self._lock:
+            self._running = False
+            if _main._pv_factory == self._create_pv:
+                _main.set_pv_factory(None)
+            if _main._normalizer_factory == self._normalizer_factory:
+                _main.set_normalizer_factory(None)
+
+    def get(self, pvname):
+        """Return value of a PV, None if not served."""
+        self._wait_latency()
+        return self._read(pvname)
+
+    def put(self, pvname, value):
+        """Write setpoint PV, updating the model."""
+        self._wait_latency()
+        with self._lock:
+            if not self._running or pvname not in self._pvnames_sp:
+                raise ConnectionError('{} not connected'.format(pvname))
+            if self._pvnames_sp[pvname] != pvname:
+                raise ValueError('{} is read only'.format(pvname))
+            self._setpoints[pvname] = value
+            device = self._devices[pvname]
+            if device is not None:
+                device.model_current = value
+
+    def serve(self, prefix='', interval=0.1):
+        """Run machine as a channel access soft IOC until stopped.
+
+        Blocks the calling thread; stop may be called from another thread.
+        """
+        import pcaspy as _pcaspy
+
+        machine = self
+
+        class _Driver(_pcaspy.Driver):
+
+            def read(self, reason):
+                value = machine.get(reason)
+                self.setParam(reason, value)
+                return value
+
+            def write(self, reason, value):
+                try:
+                    machine.put(reason, value)
+                except ValueError:
+                    return False
+                self.setParam(reason, value)
+                return True
+
+        self.start()
+        database = {
+            pvname: {'type': 'float', 'prec': 6, 'value': self._read(pvname)}
+            for pvname in self.pvnames}
+        server = _pcaspy.SimpleServer()
+        server.createPV(prefix, database)
+        _Driver()  # registers itself as driver of the server PVs
+        try:
+            while self._running:
+                server.process(interval)
+        finally:
+            self.stop()
+
+    def _read(self, pvname):
+        with self._lock:
+            if not self._running or pvname not in self._pvnames_sp:
+                return None
+            pvname_sp = self._pvnames_sp[pvname]
+            device = self._devices[pvname_sp]
+            if pvname == pvname_sp or device is None:
+                value = self._setpoints[pvname_sp]
+            else:
+                value = device.model_current
+            if pvname != pvname_sp and self.noise:
+                value += self._rng.normal(0.0, self.noise)
+            return value
+
+    def _create_pv(self, pvname):
+        return VirtualPV(pvname, self)
+
+    def _create_normalizer(self, name):
+        if self._excdata_available:
+            try:
+                return _NormFact.create(name)
+            except Exception:
+                # excitation data server not reachable; do not try again
+                self._excdata_available = False
+        return _main.LinearNormalizer(name)
+
+    def _create_devices(self):
+        # middlelayer objects changing the model, created with the machine
+        # as PV and normalizer factory; families and their magnets share the model cache of
+        # the middlelayer, so readbacks of all devices follow each put
+        self._devices = dict()
+        self._setpoints = dict()
+        for name, data in self._devices_data.items():
+            device = _main.get_element(
+                name, self.model, data['index'], data['magnet_type'],
+                data.get('magnets'))
+            pvname_sp = data['pvname_sp']
+            if data['magnet_type'].endswith(_model_types):
+                self._devices[pvname_sp] = device
+                self._setpoints[pvname_sp] = device.model_current
+            else:
+                self._devices[pvname_sp] = None
+                self._setpoints[pvname_sp] = 0.0
+
+    def _wait_latency(self):
+        if self.latency:
+            _time.sleep(self.latency)
+
+
+def get_devices_data(version, model):
+    """Return control system data of a version, with magnet types.
+
+    Values are dicts with keys 'index', 'magnet_type' and, for families,
+    'magnets', as taken by middlelayer.get_element.
+    """
+    pkg = _versions.load_version(version)
+    if not hasattr(pkg, 'get_control_system_data'):
+        raise ValueError(
+            'Version {} has no control system data'.format(version))
+    fam_data = pkg.get_family_data(model)
+    names = pkg.get_control_system_data(model, fam_data)
+    devices = dict()
+    for name, data in names.items():
+        name = _PVName(name)
+        if not isinstance(data, dict):
+            # versions giving only the model indices of each device
+            fam = name.dev
+            if fam not in pkg.family_mapping:
+                fam += '-' + name.idx
+            data = {'index': data, 'magnet_type': pkg.family_mapping[fam]}
+            if name.sub == 'Fam':
+                dta = fam_data[fam]
+                data['magnets'] = [
+                    _join_name(
+                        sec=name.sec, dis=name.dis, sub=sub, idx=inst,
+                        dev=name.dev)
+                    for sub, inst in zip(dta['subsection'], dta['instance'])]
+        devices[name] = data
+    return devices
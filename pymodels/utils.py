@@ -0,0 +1,810 @@
+"""Lattice post-processing utilities shared by the lattice versions."""
+
+import os as _os
+import json as _json
+import hashlib as _hashlib
+import collections as _collections
+
+import numpy as _np
+
+from pyaccel import lattice as _pyacc_lat, elements as _pyacc_ele, \
+    tracking as _pyacc_track
+
+
+def set_num_integ_steps(lattice, rules):
+    """Set number of integration steps of lattice elements from rules.
+
+    Keyword arguments:
+    lattice -- lattice model
+    rules -- sequence of (selection, step_length, min_steps) tuples. For each
+        element the first matching rule sets
+            nr_steps = max(min_steps, ceil(length/step_length))
+        or nr_steps = min_steps if step_length is None. Elements matching no
+        rule are left untouched. selection may be one of
+            'bend'       -- elements with non-zero angle
+            'quadrupole' -- elements with non-zero polynom_b[1]
+            'sextupole'  -- elements with non-zero polynom_b[2]
+            'multipole'  -- elements with any non-zero polynom_b
+            'other'      -- all elements
+        or a tuple of family names.
+
+    Returns numpy array with the number of steps of all elements.
+    """
+    nr_eles = len(lattice)
+    length = _np.zeros(nr_eles)
+    angle = _np.zeros(nr_eles)
+    polyb1 = _np.zeros(nr_eles)
+    polyb2 = _np.zeros(nr_eles)
+    multipole = _np.zeros(nr_eles, dtype=bool)
+    nr_steps = _np.zeros(nr_eles, dtype=int)
+    fam_names = []
+
+    # single pass over the lattice to gather attributes
+    for i in range(nr_eles):
+        ele = lattice[i]
+        polyb = ele.polynom_b
+        length[i] = ele.length
+        angle[i] = ele.angle
+        polyb1[i] = polyb[1] if len(polyb) > 1 else 0.0
+        polyb2[i] = polyb[2] if len(polyb) > 2 else 0.0
+        multipole[i] = any(polyb)
+        nr_steps[i] = ele.nr_steps
+        fam_names.append(ele.fam_name)
+    fam_names = _np.array(fam_names)
+
+    masks = {
+        'bend': angle != 0,
+        'quadrupole': polyb1 != 0,
+        'sextupole': polyb2 != 0,
+        'multipole': multipole,
+        'other': _np.ones(nr_eles, dtype=bool),
+        }
+
+    selected = _np.zeros(nr_eles, dtype=bool)
+    new_steps = nr_steps.copy()
+    for selection, step_length, min_steps in rules:
+        if isinstance(selection, str):
+            sel = masks[selection]
+        else:
+            sel = _np.isin(fam_names, selection)
+        sel = sel & ~selected
+        if step_length is None:
+            new_steps[sel] = min_steps
+        else:
+            steps = _np.ceil(length[sel]/step_length).astype(int)
+            new_steps[sel] = _np.maximum(min_steps, steps)
+        selected |= sel
+
+    # write back only elements whose number of steps changed
+    for i in _np.nonzero(new_steps != nr_steps)[0]:
+        lattice[int(i)].nr_steps = int(new_steps[i])
+    return new_steps
+
+
+def get_integ_steps_rules(rules, table_fname=None):
+    """Return integration step rules merged with a table file.
+
+    If table_fname is given, the per family steps of the table file (see
+    find_integ_steps and save_integ_steps_table) take precedence over rules,
+    which still apply to families not in the table.
+    """
+    if table_fname is None:
+        return rules
+    table = load_integ_steps_table(table_fname)
+    tuned = tuple(((fam_name, ), None, nr_steps)
+                  for fam_name, nr_steps in table.items())
+    return tuned + tuple(rules)
+
+
+def load_integ_steps_table(fname):
+    """Return dict of number of integration steps by family name."""
+    with open(fname, 'r') as fil:
+        return {fam: int(nr) for fam, nr in _json.load(fil).items()}
+
+
+def save_integ_steps_table(fname, table):
+    """Save dict of number of integration steps by family name."""
+    table = {fam: int(nr) for fam, nr in sorted(table.items())}
+    with open(fname, 'w') as fil:
+        _json.dump(table, fil, indent=4)
+        fil.write('\n')
+
+
+def find_integ_steps(lattice, energy, tolerance=1e-9, max_steps=256,
+                     particles=None, families=None):
+    """Find minimum number of integration steps of lattice families.
+
+    For each element the number of steps is the smallest one for which the
+    coordinates of test particles tracked through the element deviate by
+    less than tolerance from tracking with max_steps. The number of steps of
+    a family is the largest one of its elements. Elements are restored to
+    their original number of steps.
+
+    Keyword arguments:
+    lattice -- lattice model
+    energy -- beam energy [eV]
+    tolerance -- maximum deviation of coordinates [m, rad]
+    max_steps -- number of steps of the reference tracking
+    particles -- (6, N) array of initial coordinates of test particles. If
+        None, particles with 1 mm, 0.1 mrad and 1% energy offsets are used.
+    families -- family names to tune. If None, all families of elements
+        with non-zero length and non-drift pass method are tuned.
+
+    Returns dict of number of steps by family name.
+    """
+    if particles is None:
+        particles = _np.zeros((6, 5))
+        particles[:4, 1] = [1e-3, 1e-4, 1e-3, 1e-4]
+        particles[:4, 2] = [-1e-3, -1e-4, 1e-3, -1e-4]
+        particles[[0, 4], 3] = [1e-3, 1e-2]
+        particles[[2, 4], 4] = [1e-3, -1e-2]
+    particles = _np.asarray(particles, dtype=float)
+
+    table = dict()
+    for i in range(len(lattice)):
+        ele = lattice[i]
+        if ele.length == 0 or ele.pass_method == 'drift_pass':
+            continue
+        if families is not None and ele.fam_name not in families:
+            continue
+        nr_steps = ele.nr_steps
+        try:
+            steps = _find_element_integ_steps(
+                ele, energy, particles, tolerance, max_steps)
+        finally:
+            ele.nr_steps = nr_steps
+        table[ele.fam_name] = max(steps, table.get(ele.fam_name, 1))
+    return table
+
+
+def _find_element_integ_steps(element, energy, particles, tolerance,
+                              max_steps):
+    def track(nr_steps):
+        element.nr_steps = int(nr_steps)
+        return _np.asarray(_pyacc_track.element_pass(
+            element, particles.copy(), energy=energy))
+
+    reference = track(max_steps)
+
+    def converged(nr_steps):
+        return _np.all(_np.abs(track(nr_steps) - reference) <= tolerance)
+
+    # doubling followed by bisection, assuming convergence is monotonic
+    upper = 1
+    while upper < max_steps and not converged(upper):
+        upper *= 2
+    upper = min(upper, max_steps)
+    lower = upper // 2
+    while upper - lower > 1:
+        middle = (upper + lower) // 2
+        if converged(middle):
+            upper = middle
+        else:
+            lower = middle
+    return upper
+
+
+def get_vacuum_chamber(lattice):
+    """Return vacuum chamber profile of the lattice.
+
+    Returns hmin, hmax, vmin, vmax contiguous numpy arrays [m].
+    """
+    profile = _np.zeros((4, len(lattice)))
+    for i in range(len(lattice)):
+        ele = lattice[i]
+        profile[:, i] = ele.hmin, ele.hmax, ele.vmin, ele.vmax
+    hmin, hmax, vmin, vmax = profile
+    return hmin, hmax, vmin, vmax
+
+
+def set_vacuum_chamber(lattice, vchamber=None, regions=()):
+    """Set vacuum chamber of lattice elements from a table of regions.
+
+    Keyword arguments:
+    lattice -- lattice model
+    vchamber -- default [hmin, hmax, vmin, vmax] of all elements [m]. If
+        None the current vacuum chamber of the elements is used as default.
+    regions -- sequence of (region, vchamber) pairs applied in order. region
+        may be any numpy index (int array, list, range, slice) or a pair
+        (begin, end) of family names of markers delimiting the region
+        (first occurrences, both included, wrapping around the end of the
+        lattice if needed). None entries of vchamber leave the
+        corresponding attribute unchanged.
+
+    Returns hmin, hmax, vmin, vmax contiguous numpy arrays [m].
+    """
+    nr_eles = len(lattice)
+    if vchamber is None:
+        profile = _np.array(get_vacuum_chamber(lattice))
+    else:
+        profile = _np.empty((4, nr_eles))
+        profile[:] = _np.array(vchamber, dtype=float)[:, None]
+
+    for region, vch in regions:
+        idx = _get_region_indices(lattice, region)
+        for k, value in enumerate(vch):
+            if value is not None:
+                profile[k, idx] = value
+
+    for i in range(nr_eles):
+        ele = lattice[i]
+        ele.hmin, ele.hmax, ele.vmin, ele.vmax = profile[:, i]
+    hmin, hmax, vmin, vmax = profile
+    return hmin, hmax, vmin, vmax
+
+
+def _get_region_indices(lattice, region):
+    if isinstance(region, slice):
+        return region
+    if isinstance(region, tuple) and len(region) == 2 and \
+            all(isinstance(reg, str) for reg in region):
+        beg = _pyacc_lat.find_indices(lattice, 'fam_name', region[0])[0]
+        end = _pyacc_lat.find_indices(lattice, 'fam_name', region[1])[0]
+        if beg <= end:
+            return _np.arange(beg, end+1)
+        return _np.r_[beg:len(lattice), :end+1]
+    return _np.asarray(region, dtype=int)
+
+
+def get_segmodel_table(monomials, segmodel):
+    """Return read-only table of a hand-written segmented model.
+
+    Keyword arguments:
+    monomials -- monomials of the polynom_b columns of segmodel
+    segmodel -- list of rows [type, length [m], angle [deg], polynom_b of
+        each monomial]
+
+    Returns numpy structured array with fields 'type', 'length' [m],
+    'angle' [rad] and 'polynom_b', the latter with coefficients of all
+    monomials from 0 to max(monomials).
+    """
+    types = _np.array([row[0] for row in segmodel])
+    # rows of markers may have any number of (zero) columns
+    values = _np.zeros((len(segmodel), 2 + len(monomials)))
+    for i, row in enumerate(segmodel):
+        row = row[1:values.shape[1]+1]
+        values[i, :len(row)] = row
+    dtype = [
+        ('type', types.dtype), ('length', float), ('angle', float),
+        ('polynom_b', float, (1 + max(monomials), ))]
+    table = _np.zeros(len(segmodel), dtype=dtype)
+    table['type'] = types
+    table['length'] = values[:, 0]
+    table['angle'] = values[:, 1] * (_np.pi/180)
+    table['polynom_b'][:, monomials] = values[:, 2:]
+    table.flags.writeable = False
+    return table
+
+
+def get_quadrupole_polynoms(segmodel, strengths, errors=None):
+    """Return polynom_b of quadrupoles rescaled from a fieldmap model.
+
+    Keyword arguments:
+    segmodel -- table (see get_segmodel_table) of the half model of a
+        quadrupole with a single hard-edge segment
+    strengths -- sequence of strengths K [1/m^2] of the magnets
+    errors -- optional sequence of relative strength errors of the magnets
+
+    Returns numpy array with polynom_b of each magnet in its rows.
+    """
+    polyb = segmodel['polynom_b'][0]
+    # strength of the fieldmap model: the magnet is a single hard-edge
+    # segment, so its integrated strength over its length is polynom_b[1]
+    fmap_strength = polyb[1]
+    rescale = _np.asarray(strengths, dtype=float) / fmap_strength
+    if errors is not None:
+        rescale = rescale * (1 + _np.asarray(errors, dtype=float))
+    return polyb[None, :] * rescale[:, None]
+
+
+def create_quadrupoles(segmodel, fam_names, strengths, errors=None):
+    """Return quadrupole elements rescaled from a fieldmap model.
+
+    Arguments are those of get_quadrupole_polynoms and the family names of
+    the magnets. Returns list of elements.
+    """
+    polybs = get_quadrupole_polynoms(segmodel, strengths, errors)
+    length = 2*segmodel['length'][0]
+    polya = _np.zeros(polybs.shape[1])
+    quads = []
+    for fam_name, polyb in zip(fam_names, polybs):
+        element = _pyacc_ele.quadrupole(
+            fam_name=fam_name, length=length, K=polyb[1])
+        element.polynom_a = polya
+        element.polynom_b = polyb
+        quads.append(element)
+    return quads
+
+
+segmodel_fields = ('type', 'length', 'angle', 'polynom_b')
+
+
+def save_segmodel_table(fname, table):
+    """Save segmented model table in binary numpy (.npy) format.
+
+    table is a structured array as returned by get_segmodel_table. The file
+    can be memory-mapped with load_segmodel_table.
+    """
+    table = _np.asarray(table)
+    _check_segmodel_table(table)
+    _np.save(fname, _np.ascontiguousarray(table), allow_pickle=False)
+
+
+def load_segmodel_table(fname):
+    """Return read-only memory-mapped segmented model table of a .npy file.
+
+    Pages are read on demand and shared between processes loading the same
+    file.
+    """
+    table = _np.load(fname, mmap_mode='r', allow_pickle=False)
+    _check_segmodel_table(table)
+    return table
+
+
+def _check_segmodel_table(table):
+    names = table.dtype.names or ()
+    if any(field not in names for field in segmodel_fields):
+        raise ValueError(
+            'Segmented model table must have fields {}'.format(
+                segmodel_fields))
+
+
+def prune_polynom(polynom, r0, threshold, reference, min_terms=3):
+    """Return polynom without negligible multipoles.
+
+    Monomials n >= min_terms whose field at the reference radius,
+    |polynom[n]|*r0**n, is below threshold*reference are set to zero and
+    trailing zeros are removed. The first min_terms terms are kept.
+
+    Keyword arguments:
+    polynom -- polynom_a or polynom_b of an element
+    r0 -- reference radius [m]
+    threshold -- relative field threshold
+    reference -- reference field at r0 (e.g. dipole curvature [1/m] or
+        |K|*r0 for quadrupoles), in units of polynom[0]
+
+    Returns numpy array.
+    """
+    polynom = _np.array(polynom, dtype=float)
+    field = _np.abs(polynom) * r0**_np.arange(len(polynom))
+    field[:min_terms] = _np.inf
+    polynom[field < threshold*reference] = 0.0
+    nonzero = _np.nonzero(polynom[min_terms:])[0]
+    size = min_terms + (nonzero[-1] + 1 if len(nonzero) else 0)
+    return polynom[:size]
+
+
+PruneReport = _collections.namedtuple(
+    'PruneReport',
+    ['indices', 'nr_terms_before', 'nr_terms_after', 'speedup',
+     'max_field_deviation'])
+
+
+def prune_multipoles(lattice, r0, threshold=1e-4, min_terms=3):
+    """Trim trailing zero and negligible multipoles of lattice elements.
+
+    For each element, multipoles of order n >= min_terms of polynom_a and
+    polynom_b whose field at the reference radius, |p_n|*r0**n, is below
+    threshold times the main field at r0 are dropped. The main field is the
+    largest of the curvature angle/length and of the terms |p_n|*r0**n.
+    polynom_a and polynom_b are trimmed to the same length.
+
+    Keyword arguments:
+    lattice -- lattice model, modified in place
+    r0 -- reference radius [m]
+    threshold -- relative field error threshold at r0
+    min_terms -- number of low order terms that are always kept
+
+    Returns PruneReport namedtuple with fields
+        indices -- indices of the modified elements
+        nr_terms_before, nr_terms_after -- polynom lengths of all elements
+        speedup -- expected speedup of the multipole kick evaluation, the
+            ratio of the sums of nr_steps*nr_terms before and after
+        max_field_deviation -- largest sum of dropped |p_n|*r0**n of an
+            element, relative to its main field at r0
+    """
+    nr_eles = len(lattice)
+    before = _np.zeros(nr_eles, dtype=int)
+    after = _np.zeros(nr_eles, dtype=int)
+    nr_steps = _np.zeros(nr_eles, dtype=int)
+    indices = []
+    max_deviation = 0.0
+    for i in range(nr_eles):
+        ele = lattice[i]
+        polya = _np.array(ele.polynom_a, dtype=float)
+        polyb = _np.array(ele.polynom_b, dtype=float)
+        size = max(len(polya), len(polyb))
+        nr_steps[i] = ele.nr_steps
+        before[i] = after[i] = size
+        if size <= min_terms:
+            continue
+        polys = _np.zeros((2, size))
+        polys[0, :len(polya)] = polya
+        polys[1, :len(polyb)] = polyb
+        field = _np.abs(polys) * r0**_np.arange(size)
+        reference = _np.max(field)
+        if ele.length > 0:
+            reference = max(reference, abs(ele.angle/ele.length))
+        if reference == 0:
+            continue
+        dropped = (field < threshold*reference) & (field > 0)
+        dropped[:, :min_terms] = False
+        polys[dropped] = 0.0
+        nonzero = _np.nonzero(_np.any(polys[:, min_terms:], axis=0))[0]
+        new_size = min_terms + (nonzero[-1] + 1 if len(nonzero) else 0)
+        if not dropped.any() and new_size == size:
+            continue
+        deviation = _np.max(_np.sum(field*dropped, axis=1)) / reference
+        max_deviation = max(max_deviation, deviation)
+        ele.polynom_a = polys[0, :new_size]
+        ele.polynom_b = polys[1, :new_size]
+        after[i] = new_size
+        indices.append(i)
+
+    work = _np.sum(nr_steps*after)
+    speedup = _np.sum(nr_steps*before)/work if work else 1.0
+    return PruneReport(
+        _np.array(indices, dtype=int), before, after, speedup, max_deviation)
+
+
+Fingerprint = _collections.namedtuple('Fingerprint', ['structure', 'settings'])
+
+
+# attributes of trackcpp elements changing tracking, besides the structure.
+# Attributes not defined by the installed pyaccel version are skipped.
+tracking_attributes = (
+    'polynom_a', 'polynom_b', 'hkick_polynom', 'vkick_polynom', 'hkick',
+    'vkick', 'thin_KL', 'thin_SL', 'gap', 'fint_in', 'fint_out', 'nr_steps',
+    'hmin', 'hmax', 'vmin', 'vmax', 'vchamber', 'frequency', 'voltage',
+    'phase_lag', 'kicktable_idx', 't_in', 't_out', 'r_in', 'r_out',
+    'matrix66')
+
+
+def get_fingerprint(lattice):
+    """Return fingerprint of lattice.
+
+    The fingerprint has two hex digest strings:
+    structure -- hash of family names, pass methods, lengths and bending
+        angles of the elements.
+    settings -- hash of all other element attributes used in tracking, listed
+        in tracking_attributes: multipoles, kicks, fringe fields, apertures,
+        number of integration steps, RF parameters, kick tables,
+        misalignments (t_in, t_out, r_in, r_out) and transfer matrices.
+
+    Lattices with equal fingerprints are equal up to hash collisions. Both
+    hashes are computed from packed arrays of the element attributes.
+
+    Returns Fingerprint namedtuple.
+    """
+    nr_eles = len(lattice)
+    names = []
+    geometry = _np.zeros((nr_eles, 4))
+    values = [[] for _ in tracking_attributes]
+    for i in range(nr_eles):
+        ele = lattice[i]
+        names.append(ele.fam_name + '\0' + str(ele.pass_method))
+        geometry[i] = ele.length, ele.angle, ele.angle_in, ele.angle_out
+        for vals, attr in zip(values, tracking_attributes):
+            value = getattr(ele, attr, ())
+            vals.append(_np.asarray(value, dtype=float).ravel())
+
+    structure = _hashlib.blake2b(digest_size=16)
+    structure.update('\n'.join(names).encode())
+    structure.update(geometry.tobytes())
+
+    settings = _hashlib.blake2b(digest_size=16)
+    for vals, attr in zip(values, tracking_attributes):
+        # sizes are hashed so that arrays of different shapes never collide
+        sizes = _np.array([val.size for val in vals], dtype=_np.int64)
+        settings.update(attr.encode())
+        settings.update(sizes.tobytes())
+        if vals:
+            settings.update(_np.concatenate(vals).tobytes())
+    return Fingerprint(structure.hexdigest(), settings.hexdigest())
+
+
+def is_equal(lattice1, lattice2, settings=True):
+    """Check whether two lattices are equal from their fingerprints.
+
+    If settings is False only the structure of the lattices is compared.
+    """
+    if len(lattice1) != len(lattice2):
+        return False
+    fpr1, fpr2 = get_fingerprint(lattice1), get_fingerprint(lattice2)
+    if settings:
+        return fpr1 == fpr2
+    return fpr1.structure == fpr2.structure
+
+
+def get_settings_delta(lattice, reference, attributes=tracking_attributes):
+    """Return settings of lattice elements that differ from a reference.
+
+    Lattices built from the same nominal model (e.g. error seeds) can be
+    stored as one reference lattice plus one small delta per lattice, since
+    pyaccel elements cannot share multipole arrays.
+
+    Keyword arguments:
+    lattice -- lattice model
+    reference -- lattice model with the same structure as lattice
+    attributes -- element attributes to compare. Defaults to all attributes
+        used in tracking, including misalignments and kicks, so that applying
+        the delta to the reference reproduces the lattice.
+
+    Returns dict mapping element index to dict of attribute values.
+    """
+    if len(lattice) != len(reference):
+        raise ValueError('Lattices with different number of elements.')
+    delta = dict()
+    for i in range(len(lattice)):
+        ele, ref = lattice[i], reference[i]
+        if ele.fam_name != ref.fam_name:
+            raise ValueError('Lattices with different structures.')
+        for attr in attributes:
+            value = getattr(ele, attr, None)
+            if value is None or \
+                    _np.array_equal(value, getattr(ref, attr, None)):
+                continue
+            if isinstance(value, _np.ndarray):
+                value = value.copy()
+            delta.setdefault(i, dict())[attr] = value
+    return delta
+
+
+def apply_settings_delta(lattice, delta):
+    """Set element attributes from a delta of get_settings_delta.
+
+    Applied to the reference lattice it recovers the lattice the delta was
+    computed from, without copying the reference. Returns the delta restoring
+    the previous settings, so that variants can be applied in turn to one
+    shared reference lattice.
+    """
+    restore = dict()
+    for i, values in delta.items():
+        ele = lattice[i]
+        previous = restore[i] = dict()
+        for attr, value in values.items():
+            old = getattr(ele, attr)
+            if isinstance(old, _np.ndarray):
+                old = old.copy()
+            previous[attr] = old
+            setattr(ele, attr, value)
+    return restore
+
+
+class LatticeIndex:
+    """Family name index of lattice elements.
+
+    Maps each family name to a sorted int array with the indices of its
+    elements in the lattice. The index is built with a single pass over the
+    lattice and can be shared by all functions that look up families. Use
+    its 'shift' method to shift the lattice so that the index is kept
+    consistent with it.
+    """
+
+    def __init__(self, lattice):
+        """Build index of lattice."""
+        indices = dict()
+        for i in range(len(lattice)):
+            indices.setdefault(lattice[i].fam_name, []).append(i)
+        self._nr_elements = len(lattice)
+        self._indices = dict()
+        for fam_name, idx in indices.items():
+            self._set(fam_name, _np.array(idx, dtype=int))
+
+    def __len__(self):
+        """Return number of lattice elements."""
+        return self._nr_elements
+
+    def __contains__(self, fam_name):
+        """Check whether family is in lattice."""
+        return fam_name in self._indices
+
+    def __getitem__(self, fam_name):
+        """Return read-only int array with indices of family elements."""
+        idx = self._indices.get(fam_name)
+        if idx is None:
+            idx = _np.array([], dtype=int)
+        return idx
+
+    @property
+    def fam_names(self):
+        """Return family names in lattice."""
+        return list(self._indices)
+
+    def find_indices(self, fam_name):
+        """Return list of indices of family elements."""
+        return self[fam_name].tolist()
+
+    def find_dict(self):
+        """Return dict of lists of indices, as pyaccel.lattice.find_dict."""
+        return {key: idx.tolist() for key, idx in self._indices.items()}
+
+    def check(self, lattice):
+        """Raise ValueError if index is not consistent with lattice size."""
+        if len(lattice) != self._nr_elements:
+            raise ValueError('Lattice index does not match lattice.')
+
+    def shifted(self, start):
+        """Return index of the lattice shifted to start at element 'start'."""
+        new = LatticeIndex.__new__(LatticeIndex)
+        new._nr_elements = self._nr_elements
+        new._indices = dict()
+        start %= self._nr_elements
+        for fam_name, idx in self._indices.items():
+            sel = _np.searchsorted(idx, start)
+            idx = _np.r_[idx[sel:] - start,
+                         idx[:sel] + (self._nr_elements - start)]
+            new._set(fam_name, idx)
+        return new
+
+    def shift(self, lattice, start):
+        """Shift lattice to start at element 'start' and update index.
+
+        Returns shifted lattice.
+        """
+        self.check(lattice)
+        lattice = _pyacc_lat.shift(lattice, start)
+        self._indices = self.shifted(start)._indices
+        return lattice
+
+    def _set(self, fam_name, idx):
+        idx.flags.writeable = False
+        self._indices[fam_name] = idx
+
+
+def get_subsection_codes(nr_elements, sector_ends, thresholds):
+    """Return sector and subsection codes of lattice elements.
+
+    Sector i spans the elements from sector_ends[i-1]+1 (0 for the first
+    sector) to sector_ends[i]. Inside a sector the subsection code starts at
+    0 and is incremented after each element whose index reaches the next of
+    the sorted thresholds[i] indices, at most once per element, as done by
+    the element by element loops of the families modules.
+
+    Keyword arguments:
+    nr_elements -- number of lattice elements
+    sector_ends -- sorted int array with last element of each sector
+    thresholds -- (nr_sectors, nr_thresholds) int array
+
+    Returns two int arrays with the sector code (-1 for elements past the
+    last sector) and the subsection code of each element.
+    """
+    sector_ends = _np.asarray(sector_ends, dtype=int)
+    thres = _np.sort(_np.asarray(thresholds, dtype=int), axis=1)
+    sector_inis = _np.r_[0, sector_ends[:-1] + 1]
+
+    # index of the element at which each increment takes place
+    thres[:, 0] = _np.maximum(thres[:, 0], sector_inis)
+    for k in range(1, thres.shape[1]):
+        thres[:, k] = _np.maximum(thres[:, k], thres[:, k-1] + 1)
+
+    sector = _np.full(nr_elements, -1, dtype=int)
+    subsection = _np.zeros(nr_elements, dtype=int)
+    idx = _np.arange(sector_ends[-1] + 1)
+    sec = _np.searchsorted(sector_ends, idx)
+    sector[idx] = sec
+    subsection[idx] = _np.sum(thres[sec] < idx[:, None], axis=1)
+    return sector, subsection
+
+
+class FamilyArrays:
+    """Family data stored as flat arrays.
+
+    The indices of the elements of all magnets of the family are stored in a
+    flat int32 array: the elements of magnet i are
+        index[offsets[i]:offsets[i+1]]
+    The subsection of each magnet is stored as a code into the
+    'subsection_names' sequence and its instance as an int (0 for magnets
+    without instance number). All arrays are read-only and per-magnet access
+    returns views, so they can be used directly for numpy fancy indexing of
+    per-element attribute arrays.
+    """
+
+    __slots__ = (
+        'index', 'offsets', 'subsection_codes', 'subsection_names',
+        'instance_codes')
+
+    def __init__(self, index, offsets, subsection_codes, subsection_names,
+                 instance_codes):
+        """Create family data from arrays."""
+        self.index = _read_only(index, _np.int32)
+        self.offsets = _read_only(offsets, _np.int32)
+        self.subsection_codes = _read_only(subsection_codes, _np.int32)
+        self.subsection_names = subsection_names
+        self.instance_codes = _read_only(instance_codes, _np.int32)
+
+    @staticmethod
+    def from_dict(data, subsection_names=None):
+        """Create family data from a get_family_data family entry.
+
+        subsection_names -- optional list of subsection names, shared by
+            several families. Names not in it are appended to it.
+        """
+        if subsection_names is None:
+            subsection_names = []
+        codes = {name: i for i, name in enumerate(subsection_names)}
+        sub_codes = []
+        for name in data['subsection']:
+            if name not in codes:
+                codes[name] = len(subsection_names)
+                subsection_names.append(name)
+            sub_codes.append(codes[name])
+        idx = data['index']
+        offsets = _np.zeros(len(idx) + 1, dtype=_np.int32)
+        offsets[1:] = _np.cumsum([len(i) for i in idx])
+        flat = [j for i in idx for j in i]
+        inst = [int(i) if i else 0 for i in data['instance']]
+        return FamilyArrays(
+            flat, offsets, sub_codes, subsection_names, inst)
+
+    def __len__(self):
+        """Return number of magnets."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """Return view of indices of elements of magnet i."""
+        return self.index[self.offsets[i]:self.offsets[i+1]]
+
+    def __iter__(self):
+        """Iterate over indices of elements of each magnet."""
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nr_segments(self):
+        """Return number of elements of each magnet."""
+        return _np.diff(self.offsets)
+
+    @property
+    def magnet(self):
+        """Return magnet of each entry of the flat index array."""
+        return _np.repeat(
+            _np.arange(len(self), dtype=_np.int32), self.nr_segments)
+
+    @property
+    def first(self):
+        """Return index of first element of each magnet."""
+        return self.index[self.offsets[:-1]]
+
+    @property
+    def subsection(self):
+        """Return list with subsection name of each magnet."""
+        names = _np.array(self.subsection_names, dtype=object)
+        return names[self.subsection_codes].tolist()
+
+    @property
+    def instance(self):
+        """Return list with instance string of each magnet."""
+        return [str(i) if i else '' for i in self.instance_codes]
+
+    def to_dict(self):
+        """Return family data as in get_family_data."""
+        return {
+            'index': [idx.tolist() for idx in self],
+            'subsection': self.subsection,
+            'instance': self.instance}
+
+
+def compact_family_data(fam_data):
+    """Return family data dict converted to FamilyArrays.
+
+    fam_data is the dict returned by the get_family_data function of the
+    lattice versions. All families share the same list of subsection names.
+    Entries not in the family format (e.g. BO girder data) are returned
+    unchanged.
+
+    Returns dict.
+    """
+    subsection_names = []
+    data = dict()
+    for key, value in fam_data.items():
+        if isinstance(value, dict) and 'subsection' in value:
+            value = FamilyArrays.from_dict(value, subsection_names)
+        data[key] = value
+    return data
+
+
+def _read_only(array, dtype):
+    array = _np.array(array, dtype=dtype)
+    array.flags.writeable = False
+    return array
@@ -0,0 +1,86 @@
+"""Registry of lattice versions.
+
+A version may be declared as an overlay of a parent version, defining only
+its deltas (circumference change, optics strengths, ...) and reusing the
+modules of the parent. Segmented models, family data caches and other parts
+shared with the parent are then built once for all versions loaded side by
+side.
+"""
+
+import importlib as _importlib
+import collections as _collections
+
+
+VersionInfo = _collections.namedtuple(
+    'VersionInfo', ['name', 'accelerator', 'parent', 'deltas'])
+
+_registry = _collections.OrderedDict()
+
+# default lattice version of each accelerator
+_defaults = dict()
+
+
+def register_version(name, accelerator, parent=None, deltas=(),
+                     default=False):
+    """Register lattice version.
+
+    Keyword arguments:
+    name -- name of the version subpackage, e.g. 'SI_V25_01'
+    accelerator -- accelerator name, e.g. 'si'
+    parent -- name of the version it is an overlay of, if any
+    deltas -- names of the attributes the version overrides in its parent
+    default -- whether it is the default version of the accelerator
+    """
+    if parent is not None and parent not in _registry:
+        raise ValueError('Unknown parent version: {}'.format(parent))
+    _registry[name] = VersionInfo(name, accelerator, parent, tuple(deltas))
+    if default:
+        _defaults[accelerator] = name
+
+
+def get_versions(accelerator=None):
+    """Return names of registered versions, optionally of an accelerator."""
+    return tuple(
+        name for name, info in _registry.items()
+        if accelerator is None or info.accelerator == accelerator)
+
+
+def get_version_info(name):
+    """Return VersionInfo namedtuple of a version."""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError('Unknown lattice version: {}'.format(name))
+
+
+def get_lineage(name):
+    """Return names of a version and of its ancestors, parents last."""
+    lineage = []
+    while name is not None:
+        lineage.append(name)
+        name = get_version_info(name).parent
+    return tuple(lineage)
+
+
+def get_default_version(accelerator):
+    """Return name of the default version of an accelerator."""
+    return _defaults[accelerator]
+
+
+def load_version(name):
+    """Import and return a version subpackage (and its ancestors)."""
+    get_version_info(name)
+    return _importlib.import_module('.' + name, __package__)
+
+
+register_version('LI_V01_01', 'li', default=True)
+register_version('TB_V04_01', 'tb', default=True)
+register_version('BO_V06_01', 'bo', default=True)
+register_version(
+    'BO_V05_04', 'bo', parent='BO_V06_01',
+    deltas=('dcircum', 'optics_mode_strengths', 'accelerator_data'))
+register_version('TS_V04_01', 'ts', default=True)
+register_version('SI_V25_01', 'si', default=True)
+register_version(
+    'SI_V24_04', 'si', parent='SI_V25_01',
+    deltas=('dcircum', 'optics_mode_strengths', 'accelerator_data'))
@@ -19,6 +19,7 @@ setup(
         'Topic :: Scientific/Engineering'
     ],
     packages=find_packages(),
-    package_data={'pymodels': ['VERSION','BO_V02A/at_flat_file_M0.txt']},
+    package_data={'pymodels': ['VERSION','BO_V02A/at_flat_file_M0.txt',
+                            '*/segmodels/*.npy']},
     zip_safe=False
 )
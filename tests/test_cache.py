@@ -0,0 +1,75 @@
+#!/usr/bin/env python-sirius
+"""Tests of the caches of pymodels.cache."""
+
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+
+import pymodels
+from pymodels import cache
+
+
+def _create_lattice(fam_names):
+    return [SimpleNamespace(fam_name=name) for name in fam_names]
+
+
+class TestMemoizeByStructure(TestCase):
+
+    def setUp(self):
+        self.nr_calls = 0
+
+        @cache.memoize_by_structure('TEST')
+        def get_data(lattice):
+            self.nr_calls += 1
+            return {'QF': {'index': [[0], [2]]}, 'QD': {'index': [[1]]}}
+        self.get_data = get_data
+
+    def test_memoized_by_structure(self):
+        self.get_data(_create_lattice(['QF', 'QD', 'QF']))
+        self.get_data(_create_lattice(['QF', 'QD', 'QF']))
+        self.assertEqual(self.nr_calls, 1)
+        self.get_data(_create_lattice(['QF', 'QF', 'QD']))
+        self.assertEqual(self.nr_calls, 2)
+        self.assertEqual(self.get_data.cache_info().hits, 1)
+
+    def test_result_modification_not_shared(self):
+        lattice = _create_lattice(['QF', 'QD', 'QF'])
+        data = self.get_data(lattice)
+        data['QF']['index'].append([5])
+        data.pop('QD')
+        data = self.get_data(lattice)
+        self.assertEqual(data['QF']['index'], [[0], [2]])
+        self.assertIn('QD', data)
+        data['QF']['index'][0].append(7)
+        self.assertEqual(self.get_data(lattice)['QF']['index'], [[0], [2]])
+
+    def test_structure_key(self):
+        key = cache.get_structure_key(_create_lattice(['QF', 'QD', 'QF']))
+        self.assertEqual(
+            key, cache.get_structure_key(_create_lattice(['QF', 'QD', 'QF'])))
+        self.assertNotEqual(
+            key, cache.get_structure_key(_create_lattice(['QF', 'QDQ', 'F'])))
+        self.assertEqual(len(key[1]), 16)
+
+    def test_copy_containers(self):
+        data = {'QF': {'index': [[0], [2]], 'subsection': ['01M1', '01M2'],
+                       'strengths': np.zeros(2)}}
+        copy = cache._copy_containers(data)
+        self.assertEqual(copy['QF']['index'], data['QF']['index'])
+        self.assertIsNot(copy['QF']['index'][0], data['QF']['index'][0])
+        self.assertIsNot(copy['QF']['subsection'], data['QF']['subsection'])
+        self.assertIsNot(copy['QF']['strengths'], data['QF']['strengths'])
+
+
+class TestFamilyData(TestCase):
+
+    def test_result_modification_not_shared(self):
+        model = pymodels.bo.create_accelerator()
+        data = pymodels.bo.get_family_data(model)
+        index = [list(idx) for idx in data['QF']['index']]
+        data['QF']['index'].append([0])
+        data.pop('QD')
+        data = pymodels.bo.get_family_data(model)
+        self.assertEqual(data['QF']['index'], index)
+        self.assertIn('QD', data)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python-sirius
+"""Tests of the family data of the lattice versions."""
+
+from unittest import TestCase
+
+from siriuspy.namesys import join_name
+
+import pymodels
+from pymodels.SI_V25_01 import segmented_models as si_segmodels
+
+
+class TestSIFamilyData(TestCase):
+
+    def test_dipoles_at_every_fidelity(self):
+        nr_magnets = {'B1': 40, 'B2': 40, 'BC': 20}
+        for fidelity in si_segmodels.fidelity_levels:
+            model = pymodels.si.create_accelerator(fidelity=fidelity)
+            fam_data = pymodels.si.get_family_data(model)
+            for fam, nr in nr_magnets.items():
+                index = fam_data[fam]['index']
+                msg = '{} {}'.format(fidelity, fam)
+                self.assertEqual(len(index), nr, msg)
+                self.assertEqual(
+                    sum(len(idx) for idx in index),
+                    sum(model[i].fam_name == fam for i in range(len(model))),
+                    msg)
+                self.assertEqual(len(set(map(len, index))), 1, msg)
+            self.assertEqual(len(fam_data['B1B2-1']['index']), 80)
+            names = pymodels.si.get_control_system_data(model, fam_data)
+            name = join_name(sec='SI', dis='MA', sub='Fam', dev='B1B2-1')
+            self.assertEqual(len(names[name]), 80, fidelity)
+
+    def test_full_fidelity_segmentation(self):
+        model = pymodels.si.create_accelerator(fidelity='full')
+        fam_data = pymodels.si.get_family_data(model)
+        for fam, nr in (('B1', 30), ('B2', 36), ('BC', 34)):
+            self.assertEqual(len(fam_data[fam]['index'][0]), nr)
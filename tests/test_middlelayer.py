@@ -0,0 +1,245 @@
+#!/usr/bin/env python-sirius
+"""Tests of pymodels.middlelayer."""
+
+import time
+import threading
+import concurrent.futures as futures
+from unittest import TestCase, mock, skipUnless
+
+import numpy as np
+
+from siriuspy.namesys import SiriusPVName
+
+import pymodels
+from pymodels.middlelayer import main, group, virtual, ElementGroup, \
+    VirtualMachine
+
+try:
+    import pcaspy
+    import epics
+except ImportError:
+    pcaspy = epics = None
+
+
+class _StubPV():
+    """PV kept in memory, with the interface of the EPICS PVs."""
+
+    def __init__(self, pvname):
+        self.pvname = pvname
+        self.value = 1.0
+        self.connected = True
+        self.delay = 0.0  # [s] of each get
+
+    def wait_for_connection(self, timeout=None):
+        return self.connected
+
+    def get(self, timeout=None):
+        time.sleep(self.delay)
+        return self.value
+
+    def put(self, value, wait=False, timeout=None):
+        self.value = value
+
+
+class _MiddlelayerTestCase(TestCase):
+    """Middlelayer objects on a BO model with stub PVs and normalizers."""
+
+    def setUp(self):
+        main.set_pv_factory(_StubPV)
+        self.addCleanup(main.set_pv_factory)
+        main.set_normalizer_factory(
+            lambda name: main.LinearNormalizer(name, factor=0.01))
+        self.addCleanup(main.set_normalizer_factory)
+        self.model = pymodels.bo.create_accelerator()
+        self.fam_data = pymodels.bo.get_family_data(self.model)
+
+    def get_family(self, fam, magnet_type):
+        index = self.fam_data[fam]['index']
+        magnets = [
+            SiriusPVName('BO-{:02d}U:PS-{}'.format(i+1, fam))
+            for i in range(len(index))]
+        family = main.get_element(
+            SiriusPVName('BO-Fam:PS-' + fam), self.model, index, magnet_type,
+            magnets)
+        return family, magnets
+
+    def get_magnet(self, fam, magnet_type, magnet=0):
+        index = self.fam_data[fam]['index'][magnet]
+        return main.get_element(
+            SiriusPVName('BO-{:02d}U:PS-{}'.format(magnet+1, fam)),
+            self.model, index, magnet_type)
+
+
+class TestModelCache(_MiddlelayerTestCase):
+
+    def test_family_and_element(self):
+        family, _ = self.get_family('QF', 'quadrupole')
+        element = self.get_magnet('QF', 'quadrupole')
+        strength = element.model_strength
+        family.model_strength = 1.1 * family.model_strength
+        self.assertAlmostEqual(element.model_strength, 1.1 * strength)
+        element.model_strength = 2 * strength
+        np.testing.assert_allclose(
+            family._get_model_strengths()[0], 2 * strength)
+        self.assertAlmostEqual(element.model_current, 200 * strength)
+
+    def test_external_change(self):
+        element = self.get_magnet('QF', 'quadrupole')
+        strength = element.model_strength
+        for idx in element.model_indices:
+            self.model[idx].polynom_b *= 3
+        main.invalidate_model_cache(self.model)
+        self.assertAlmostEqual(element.model_strength, 3 * strength)
+
+    def test_model_without_weakref(self):
+        # plain lists can not be weakly referenced and are not cached
+        model = list(self.model)
+        index = self.fam_data['QF']['index'][0]
+        element = main.ModelElement('QF', model, index, 'quadrupole')
+        strength = element.model_strength
+        for idx in index:
+            model[idx].polynom_b *= 3
+        self.assertAlmostEqual(element.model_strength, 3 * strength)
+        self.assertNotIn(id(model), main._segment_stores)
+
+
+class TestZeroStrength(_MiddlelayerTestCase):
+
+    def test_family(self):
+        family, _ = self.get_family('QF', 'quadrupole')
+        element = self.get_magnet('QF', 'quadrupole')
+        element.model_strength = 0.0
+        strengths = family._get_model_strengths()
+        with self.assertRaises(ValueError):
+            family.model_strength = family.model_strength + 0.1
+        np.testing.assert_array_equal(
+            family._get_model_strengths(), strengths)
+        self.assertTrue(np.all(np.isfinite(
+            [self.model[idx].polynom_b for idx in family._seg_indcs])))
+
+    def test_element(self):
+        element = self.get_magnet('QF', 'quadrupole')
+        element.model_strength = 0.0
+        element.model_strength = 0.0
+        with self.assertRaises(ValueError):
+            element.model_strength = 1.0
+        self.assertEqual(element.model_strength, 0.0)
+
+
+class TestElementGroup(_MiddlelayerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.elements = [
+            self.get_magnet('QF', 'quadrupole', i) for i in range(8)]
+
+    def test_partial_failure(self):
+        self.elements[2]._rb.connected = False
+        result = ElementGroup(self.elements).get_current()
+        self.assertEqual(list(result.failed), [self.elements[2]._name])
+        self.assertIn(
+            'ConnectionError', result.failed[self.elements[2]._name])
+        self.assertTrue(np.isnan(result.values[2]))
+        np.testing.assert_array_equal(np.delete(result.values, 2), 1.0)
+
+    def test_timeout(self):
+        self.elements[5]._rb.delay = 0.5
+        result = ElementGroup(self.elements, timeout=0.1).get_current()
+        self.assertEqual(
+            result.failed, {self.elements[5]._name: 'timeout'})
+
+    def test_timeout_excludes_queue(self):
+        # calls of 0.05 s on 2 workers take 0.2 s, longer than the timeout
+        executor = futures.ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        patcher = mock.patch.object(group, '_executor', executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for ele in self.elements:
+            ele._rb.delay = 0.05
+        result = ElementGroup(self.elements, timeout=0.1).get_current()
+        self.assertEqual(result.failed, dict())
+
+    def test_scalar_broadcast(self):
+        result = ElementGroup(self.elements).set_current(2.0)
+        self.assertEqual(result.failed, dict())
+        np.testing.assert_array_equal(result.values, 2.0)
+        self.assertEqual([ele._sp.value for ele in self.elements], [2.0] * 8)
+        result = ElementGroup(self.elements).set_strength(0.5)
+        np.testing.assert_array_equal(result.values, 50.0)
+
+
+class TestVirtualMachine(TestCase):
+
+    def start_machine(self, version, **kwargs):
+        machine = VirtualMachine(version, **kwargs)
+        machine.start()
+        self.addCleanup(machine.stop)
+        return machine
+
+    def test_family_put(self):
+        machine = self.start_machine(
+            'SI_V25_01', normalizer_factory=main.LinearNormalizer)
+        fam_sp, fam_rb = main.get_pvnames(
+            SiriusPVName('SI-Fam:MA-QFA'), 'quadrupole', family=True)
+        _, mag_rb = main.get_pvnames(
+            SiriusPVName('SI-01M1:MA-QFA'), 'quadrupole')
+        fam_current = machine.get(fam_rb)
+        mag_current = machine.get(mag_rb)
+        machine.put(fam_sp, 1.1 * fam_current)
+        self.assertAlmostEqual(machine.get(fam_rb), 1.1 * fam_current)
+        self.assertAlmostEqual(machine.get(mag_rb), 1.1 * mag_current)
+
+    def test_linear_normalizer(self):
+        machine = self.start_machine(
+            'TB_V04_01', normalizer_factory=main.LinearNormalizer)
+        name, data = next(
+            (name, data) for name, data in machine._devices_data.items()
+            if data['magnet_type'] == 'quadrupole')
+        element = main.get_element(
+            name, machine.model, data['index'], data['magnet_type'])
+        self.assertAlmostEqual(element.current, element.model_strength)
+        element.strength = 2 * element.strength
+        self.assertAlmostEqual(element.current, element.model_strength)
+
+    def test_offline(self):
+        create = mock.Mock(side_effect=ConnectionError('offline'))
+        with mock.patch.object(virtual._NormFact, 'create', create):
+            machine = self.start_machine('TB_V04_01')
+        create.assert_called_once()
+        norms = [
+            device._norm for device in machine._devices.values()
+            if device is not None]
+        self.assertTrue(norms)
+        self.assertTrue(all(
+            isinstance(norm, main.LinearNormalizer) for norm in norms))
+        self.assertIs(main._normalizer_factory, machine._normalizer_factory)
+        machine.stop()
+        self.assertIsNone(main._normalizer_factory)
+
+
+@skipUnless(pcaspy and epics, 'requires pcaspy and pyepics')
+class TestServe(TestCase):
+
+    def test_channel_access(self):
+        machine = VirtualMachine(
+            'TB_V04_01', normalizer_factory=main.LinearNormalizer)
+        thread = threading.Thread(
+            target=machine.serve, kwargs={'prefix': 'PYMODELS-TEST:'},
+            daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(machine.stop)
+        name, data = next(
+            (name, data) for name, data in machine._devices_data.items()
+            if data['magnet_type'] == 'quadrupole')
+        pvname_sp, pvname_rb = main.get_pvnames(name, data['magnet_type'])
+        pv_sp = epics.PV('PYMODELS-TEST:' + pvname_sp)
+        pv_rb = epics.PV('PYMODELS-TEST:' + pvname_rb)
+        self.assertTrue(pv_rb.wait_for_connection(timeout=5))
+        current = pv_rb.get(use_monitor=False)
+        self.assertAlmostEqual(current, machine.get(pvname_rb), places=6)
+        pv_sp.put(2 * current, wait=True, timeout=5)
+        self.assertAlmostEqual(machine.get(pvname_sp), 2 * current, places=6)
+        self.assertAlmostEqual(
+            pv_rb.get(use_monitor=False), 2 * current, places=6)
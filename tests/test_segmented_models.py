@@ -0,0 +1,64 @@
+#!/usr/bin/env python-sirius
+"""Tests of the segmented models of the lattice versions."""
+
+from unittest import TestCase
+
+import numpy as np
+
+import pymodels
+from pymodels.BO_V06_01 import segmented_models as bo_segmodels
+from pymodels.SI_V25_01 import segmented_models as si_segmodels
+
+
+class TestBOModelCache(TestCase):
+
+    def tearDown(self):
+        bo_segmodels.model_cache_size = 1024
+        bo_segmodels.clear_model_cache()
+
+    def test_model_cache_size(self):
+        bo_segmodels.model_cache_size = 1
+        bo_segmodels.clear_model_cache()
+        bo_segmodels.dipole(3e9)
+        bo_segmodels.dipole(2e9)
+        info = bo_segmodels.get_model_cache_info()
+        self.assertEqual(info.maxsize, 1)
+        self.assertEqual(info.currsize, 1)
+        bo_segmodels.model_cache_size = 4
+        bo_segmodels.dipole(3e9)
+        bo_segmodels.dipole(3e9)
+        info = bo_segmodels.get_model_cache_info()
+        self.assertEqual((info.maxsize, info.hits, info.misses), (4, 1, 1))
+
+
+class TestSIFastDipoles(TestCase):
+
+    def test_fast_models_keep_length_and_angle(self):
+        for fam, func in (('B1', si_segmodels.dipole_b1),
+                          ('B2', si_segmodels.dipole_b2)):
+            full = func('m_accep', fidelity='full')
+            fast = func('m_accep', fidelity='fast')
+            self.assertEqual([ele.fam_name for ele in fast][1], fam)
+            for attr in ('length', 'angle'):
+                self.assertAlmostEqual(
+                    np.sum([getattr(ele, attr) for ele in full]),
+                    np.sum([getattr(ele, attr) for ele in fast]))
+
+    def test_fast_bc_requires_bc_layout(self):
+        model = si_segmodels.dipole_bc('m_accep', fidelity='fast')
+        self.assertEqual(
+            [ele.fam_name for ele in model].count('m_accep'), 2)
+        with self.assertRaises(ValueError):
+            si_segmodels.dipole_bc('m_accep', fidelity='fast', segmodel='B1')
+
+
+class TestQuadrupoleErrors(TestCase):
+
+    def test_family_errors(self):
+        model0 = pymodels.ts.lattice.create_lattice()[0]
+        model1 = pymodels.ts.lattice.create_lattice(
+            quadrupole_errors={'QF2': 1e-3})[0]
+        for ele0, ele1 in zip(model0, model1):
+            ratio = 1.001 if ele0.fam_name == 'QF2' else 1.0
+            np.testing.assert_allclose(
+                ele1.polynom_b, ratio*ele0.polynom_b, rtol=1e-12)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python-sirius
+"""Tests of pymodels.utils."""
+
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+import pyaccel
+
+import pymodels
+from pymodels import utils
+
+
+def _set_errors(model):
+    """Misalign some elements and set corrector kicks of model.
+
+    Returns indices of the changed elements.
+    """
+    fam_data = pymodels.bo.get_family_data(model)
+    idx_qf, idx_qd, idx_ch, idx_sf = [
+        fam_data[fam]['index'][0][0] for fam in ('QF', 'QD', 'CH', 'SF')]
+    model[idx_qf].t_in = np.array([1e-5, 0, -2e-5, 0, 0, 0])
+    model[idx_qf].t_out = -model[idx_qf].t_in
+    rot = np.eye(6)
+    rot[0, 2], rot[2, 0] = 1e-4, -1e-4
+    model[idx_qd].r_in = rot
+    model[idx_qd].r_out = rot.T
+    model[idx_ch].hkick = 1e-6
+    model[idx_sf].vkick_polynom = -2e-6
+    return sorted([idx_qf, idx_qd, idx_ch, idx_sf])
+
+
+def _create_drift(fam_name, length):
+    """Drift with only some of the tracking attributes, as in old pyaccel."""
+    return SimpleNamespace(
+        fam_name=fam_name, pass_method='drift_pass', length=length,
+        angle=0.0, angle_in=0.0, angle_out=0.0, polynom_a=np.zeros(3),
+        polynom_b=np.zeros(3), nr_steps=1)
+
+
+class TestFingerprint(TestCase):
+
+    def test_settings(self):
+        model1 = pymodels.bo.create_accelerator()
+        model2 = pymodels.bo.create_accelerator()
+        self.assertEqual(
+            utils.get_fingerprint(model1), utils.get_fingerprint(model2))
+        _set_errors(model2)
+        fpr1 = utils.get_fingerprint(model1)
+        fpr2 = utils.get_fingerprint(model2)
+        self.assertEqual(fpr1.structure, fpr2.structure)
+        self.assertNotEqual(fpr1.settings, fpr2.settings)
+
+    def test_each_attribute(self):
+        model = pymodels.bo.create_accelerator()
+        fprs = {utils.get_fingerprint(model).settings}
+        model[10].t_in = np.array([1e-5, 0, 0, 0, 0, 0])
+        fprs.add(utils.get_fingerprint(model).settings)
+        model[10].hkick = 1e-6
+        fprs.add(utils.get_fingerprint(model).settings)
+        model[10].phase_lag = 0.1
+        fprs.add(utils.get_fingerprint(model).settings)
+        model[10].thin_KL = 0.01
+        fprs.add(utils.get_fingerprint(model).settings)
+        model[10].fint_in = 0.5
+        fprs.add(utils.get_fingerprint(model).settings)
+        self.assertEqual(len(fprs), 6)
+
+    def test_plain_elements(self):
+        def create():
+            return [pyaccel.elements.marker('start'),
+                    pyaccel.elements.drift('l1', 1.0)]
+        self.assertEqual(
+            utils.get_fingerprint(create()), utils.get_fingerprint(create()))
+
+    def test_missing_attributes(self):
+        reference = [_create_drift('l1', 1.0), _create_drift('l2', 0.5)]
+        lattice = [_create_drift('l1', 1.0), _create_drift('l2', 0.5)]
+        self.assertEqual(
+            utils.get_fingerprint(lattice), utils.get_fingerprint(reference))
+        lattice[1].polynom_b[1] = 0.1
+        self.assertNotEqual(
+            utils.get_fingerprint(lattice).settings,
+            utils.get_fingerprint(reference).settings)
+        delta = utils.get_settings_delta(lattice, reference)
+        self.assertEqual(list(delta), [1])
+        self.assertEqual(list(delta[1]), ['polynom_b'])
+
+
+class TestSettingsDelta(TestCase):
+
+    def test_round_trip(self):
+        reference = pymodels.bo.create_accelerator()
+        model = pymodels.bo.create_accelerator()
+        indices = _set_errors(model)
+        delta = utils.get_settings_delta(model, reference)
+        self.assertEqual(sorted(delta), indices)
+        utils.apply_settings_delta(reference, delta)
+        self.assertEqual(
+            utils.get_fingerprint(reference), utils.get_fingerprint(model))
+        self.assertTrue(utils.is_equal(reference, model))
+
+    def test_restore(self):
+        reference = pymodels.bo.create_accelerator()
+        fingerprint = utils.get_fingerprint(reference)
+        model = pymodels.bo.create_accelerator()
+        _set_errors(model)
+        delta = utils.get_settings_delta(model, reference)
+        restore = utils.apply_settings_delta(reference, delta)
+        self.assertEqual(sorted(restore), sorted(delta))
+        utils.apply_settings_delta(reference, restore)
+        self.assertEqual(utils.get_fingerprint(reference), fingerprint)
+
+    def test_lattice_variant(self):
+        lattice = pymodels.bo.lattice
+        reference = lattice.create_lattice()
+        strengths = lattice.get_optics_mode(lattice.default_optics_mode)
+        strengths['qf'] *= 1.01
+        delta = lattice.create_lattice(
+            strengths=strengths, reference=reference)
+        fam_data = pymodels.bo.get_family_data(reference)
+        indices = sorted(idx for idcs in fam_data['QF']['index']
+                         for idx in idcs)
+        self.assertEqual(sorted(delta), indices)
+        self.assertEqual(
+            [list(values) for values in delta.values()],
+            [['polynom_b']] * len(indices))
+        # the delta holds one attribute of the QF segments, instead of a
+        # full copy of all tracking attributes of all elements
+        nr_values = sum(len(values) for values in delta.values())
+        self.assertLess(
+            nr_values, 0.01 * len(reference) * len(utils.tracking_attributes))
+        utils.apply_settings_delta(reference, delta)
+        self.assertTrue(utils.is_equal(
+            reference, lattice.create_lattice(strengths=strengths)))
+
+
+class TestIntegStepsRules(TestCase):
+
+    def test_no_table(self):
+        rules = (('quadrupole', 0.015, 0), )
+        self.assertIs(utils.get_integ_steps_rules(rules), rules)
+
+    def test_table(self):
+        rules = (('quadrupole', 0.015, 0), )
+        with tempfile.TemporaryDirectory() as folder:
+            fname = os.path.join(folder, 'integ_steps.json')
+            utils.save_integ_steps_table(fname, {'QF': 12, 'QD': 8})
+            tuned = utils.get_integ_steps_rules(rules, fname)
+        self.assertEqual(
+            tuned, ((('QD', ), None, 8), (('QF', ), None, 12)) + rules)
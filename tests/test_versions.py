@@ -0,0 +1,32 @@
+#!/usr/bin/env python-sirius
+"""Tests of the lattice version registry."""
+
+import inspect
+from unittest import TestCase
+
+from pymodels import versions
+
+
+class TestOverlays(TestCase):
+
+    def test_create_accelerator_parity(self):
+        for name in versions.get_versions():
+            parent = versions.get_version_info(name).parent
+            if parent is None:
+                continue
+            with self.subTest(version=name):
+                params = inspect.signature(
+                    versions.load_version(name).create_accelerator).parameters
+                parent_params = inspect.signature(
+                    versions.load_version(parent).create_accelerator
+                    ).parameters
+                self.assertEqual(list(params), list(parent_params))
+
+    def test_si_fidelity(self):
+        module = versions.load_version('SI_V24_04')
+        parent = versions.load_version('SI_V25_01')
+        for fidelity in ('fast', 'full'):
+            with self.subTest(fidelity=fidelity):
+                acc = module.create_accelerator(fidelity=fidelity)
+                parent_acc = parent.create_accelerator(fidelity=fidelity)
+                self.assertEqual(len(acc), len(parent_acc))